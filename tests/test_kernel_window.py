@@ -19,3 +19,16 @@ def test_kernel_version_series_comparison():
     assert version1.series < version2.series
     assert version2.series == version3.series
 
+
+# Test KernelVersion pooling
+def test_kernel_version_get_is_shared():
+    version1 = KernelVersion.get("5.4.0-42-generic")
+    version2 = KernelVersion.get("5.4.0-42-generic")
+    assert version1 is version2
+    assert version1.version_id == KernelVersion("5.4.0-42-generic").version_id
+
+# Test KernelVersion ordering
+def test_kernel_version_ordering():
+    versions = [KernelVersion(v) for v in ("5.4.0", "4.15.0-44-generic", "5.4-rc3", "4.15.0-43-generic")]
+    assert [v.version for v in sorted(versions)] == ["4.15.0-43-generic", "4.15.0-44-generic", "5.4-rc3", "5.4.0"]
+    assert KernelVersion("4.15.0-43-generic") == KernelVersion("4.15.0-43-lowlatency")
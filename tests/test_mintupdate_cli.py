@@ -0,0 +1,55 @@
+#!/usr/bin/python3
+
+import sys, os
+myPath = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, myPath + '/../usr/lib/linuxmint/mintUpdate/')
+
+import importlib.util
+
+# mintupdate-cli.py can't be imported by name
+spec = importlib.util.spec_from_file_location(
+    "mintupdate_cli", myPath + '/../usr/lib/linuxmint/mintUpdate/mintupdate-cli.py')
+mintupdate_cli = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(mintupdate_cli)
+
+# Test the split of the blacklist into literal names and glob patterns
+def test_load_blacklist_splits_literals_and_globs(monkeypatch):
+    monkeypatch.setattr(mintupdate_cli, "read_blacklist_file", lambda: frozenset(
+        ["firefox", "xed=3.0", "xed=3.1", "linux-*=5.0", "mint?", "pix=1.0"]))
+    literals, globs = mintupdate_cli.load_blacklist("pix,thunderbird=2.0")
+    assert literals == {
+        "firefox": None,
+        "xed": {"3.0", "3.1"},
+        "pix": None,
+        "thunderbird": {"2.0"},
+    }
+    assert sorted((pattern.pattern, version) for pattern, version in globs) == sorted([
+        (mintupdate_cli.compile_glob("linux-*").pattern, "5.0"),
+        (mintupdate_cli.compile_glob("mint?").pattern, None),
+    ])
+
+# Test blacklist matching against literal names and glob patterns
+def test_is_blacklisted(monkeypatch):
+    monkeypatch.setattr(mintupdate_cli, "read_blacklist_file", lambda: frozenset(
+        ["firefox", "xed=3.0", "linux-*=5.0", "mint?"]))
+    literals, globs = mintupdate_cli.load_blacklist(None)
+    is_blacklisted = mintupdate_cli.is_blacklisted
+    assert is_blacklisted(literals, globs, "firefox", "1.0")
+    assert is_blacklisted(literals, globs, "xed", "3.0")
+    assert not is_blacklisted(literals, globs, "xed", "3.1")
+    assert is_blacklisted(literals, globs, "linux-signed", "5.0")
+    assert not is_blacklisted(literals, globs, "linux-signed", "5.1")
+    assert is_blacklisted(literals, globs, "mintx", "1.0")
+    assert not is_blacklisted(literals, globs, "mintupdate", "1.0")
+    # Glob characters are not special in literal names
+    assert not is_blacklisted(literals, globs, "firefox-esr", "1.0")
+
+# Test that the blacklist file is parsed without comments and empty lines
+def test_read_blacklist_file(tmp_path, monkeypatch):
+    path = tmp_path / "mintupdate.blacklist"
+    path.write_text("# comment\n\nfirefox\n  xed=3.0  \n")
+    monkeypatch.setattr(mintupdate_cli, "BLACKLIST_FILE", str(path))
+    monkeypatch.setattr(mintupdate_cli, "_blacklist_cache", {"mtime": None, "entries": frozenset()})
+    assert mintupdate_cli.read_blacklist_file() == {"firefox", "xed=3.0"}
+    monkeypatch.setattr(mintupdate_cli, "BLACKLIST_FILE", str(tmp_path / "missing"))
+    assert mintupdate_cli.read_blacklist_file() == frozenset()
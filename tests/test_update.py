@@ -0,0 +1,77 @@
+#!/usr/bin/python3
+
+import sys, os
+myPath = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, myPath + '/../usr/lib/linuxmint/mintUpdate/')
+
+from Classes import Update, UPDATE_FIELDS
+from checkAPT import APTCheck
+
+class FakeOrigin:
+    origin = "Ubuntu"
+    archive = "jammy-updates"
+    label = "Ubuntu"
+    site = "archive.ubuntu.com"
+    component = "main"
+
+class FakeVersion:
+    def __init__(self, version, source_name):
+        self.version = version
+        self.source_name = source_name
+        self.source_version = version
+        self.size = 2048
+        self.section = "editors"
+        self.raw_description = "Text editor"
+        self.description = "A text editor\n with ### and ---EOL--- in it"
+        self.origins = [FakeOrigin()]
+
+class FakePackage:
+    def __init__(self, name, old_version, new_version, source_name="xed"):
+        self.name = name
+        self.candidate = FakeVersion(new_version, source_name)
+        self.installed = FakeVersion(old_version, source_name) if old_version else None
+        self.is_installed = self.installed is not None
+
+class FakeSettings:
+    def get_strv(self, key):
+        return []
+
+def new_apt_check():
+    check = APTCheck.__new__(APTCheck)
+    check.settings = FakeSettings()
+    check.updates = {}
+    check.priority_updates_available = False
+    return check
+
+# Test that updates survive the JSON line written by checkAPT.py
+def test_update_serialization_round_trip(capsys):
+    update = Update(FakePackage("xed", "3.0", "3.1"))
+    update.add_package(FakePackage("xed-common", "3.0", "3.1"))
+    update.serialize()
+    line = capsys.readouterr().out
+    assert line.count("\n") == 1
+
+    parsed = Update(input_string=line.strip())
+    for field in UPDATE_FIELDS:
+        if field == "source_packages":
+            assert set(parsed.source_packages) == update.source_packages
+        else:
+            assert getattr(parsed, field) == getattr(update, field)
+    assert parsed.size == 4096
+    assert parsed.package_names == ["xed", "xed-common"]
+
+# Test that packages which are already up to date have no update type
+def test_update_without_new_version():
+    assert Update(FakePackage("xed", "3.1", "3.1")).type is None
+    assert Update(FakePackage("xed", "3.0", "3.1")).type == "package"
+    assert Update(FakePackage("xed", None, "3.1")).old_version == ""
+
+# Test that checkAPT skips updates without a type
+def test_apt_check_skips_untyped_updates():
+    check = new_apt_check()
+    check.add_update(FakePackage("xed", "3.1", "3.1"))
+    assert check.updates == {}
+
+    check.add_update(FakePackage("xed", "3.0", "3.1"))
+    assert list(check.updates) == ["xed"]
+    assert check.updates["xed"].type == "package"
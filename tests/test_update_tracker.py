@@ -0,0 +1,100 @@
+#!/usr/bin/python3
+
+import sys, os
+myPath = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, myPath + '/../usr/lib/linuxmint/mintUpdate/')
+
+import gzip
+import json
+import Classes
+from Classes import UpdateTracker
+
+class FakeSettings:
+    def get_boolean(self, key):
+        return False
+
+class FakeLogger:
+    def __init__(self):
+        self.messages = []
+
+    def write(self, message):
+        self.messages.append(message)
+
+class FakeUpdate:
+    def __init__(self, real_source_name, type):
+        self.real_source_name = real_source_name
+        self.type = type
+
+def write_tracker_file(path, data):
+    with open(os.path.join(path, "updates.json"), "w") as f:
+        json.dump(data, f)
+
+# Test the conversion of version 1 records to [type, since, days] lists
+def test_tracker_migrates_version_1(tmp_path, monkeypatch):
+    monkeypatch.setattr(Classes, "CONFIG_PATH", str(tmp_path))
+    write_tracker_file(tmp_path, {
+        "version": 1,
+        "checked": "2000.01.01",
+        "notified": "2000.01.01",
+        "updates": {
+            "firefox": {"type": "security", "since": "2000.01.01", "days": 3},
+            "xed": {"type": "package", "since": "2000.01.01", "days": 1},
+        },
+    })
+    tracker = UpdateTracker(FakeSettings(), FakeLogger())
+    assert tracker.active
+    assert tracker.tracked_updates["version"] == 2
+    assert tracker.tracked_updates["updates"] == {
+        "firefox": ["security", "2000.01.01", 3],
+        "xed": ["package", "2000.01.01", 1],
+    }
+
+    # Migrated records are updated and saved like version 2 ones
+    tracker.update(FakeUpdate("firefox", "security"))
+    assert tracker.tracked_updates["updates"]["firefox"] == ["security", "2000.01.01", 4]
+    assert tracker.max_days == 4
+    assert tracker.oldest_since_date == "2000.01.01"
+    tracker.record()
+    with open(tracker.path) as f:
+        saved = json.load(f)
+    assert saved["version"] == 2
+    assert saved["updates"] == {"firefox": ["security", "2000.01.01", 4]}
+
+# Test that unknown tracker versions are reset
+def test_tracker_resets_unknown_version(tmp_path, monkeypatch):
+    monkeypatch.setattr(Classes, "CONFIG_PATH", str(tmp_path))
+    write_tracker_file(tmp_path, {
+        "version": 0,
+        "checked": "2000.01.01",
+        "notified": "2000.01.01",
+        "updates": {"firefox": ["security", "2000.01.01", 3]},
+    })
+    tracker = UpdateTracker(FakeSettings(), FakeLogger())
+    assert tracker.tracked_updates["version"] == 2
+    assert tracker.tracked_updates["updates"] == {}
+    assert tracker.tracked_updates["checked"] == tracker.today
+
+# Test that the APT history is scanned the same in blocks as in one read
+def test_scan_apt_history_in_blocks(tmp_path, monkeypatch):
+    monkeypatch.setattr(Classes, "CONFIG_PATH", str(tmp_path))
+    tracker = UpdateTracker(FakeSettings(), FakeLogger())
+    events = [
+        "Start-Date: 2024-01-02  10:00:00\nCommandline: apt upgrade\n"
+        "Upgrade: xed:amd64 (3.0, 3.1)\nEnd-Date: 2024-01-02  10:01:00\n",
+        "Start-Date: 2024-03-04  10:00:00\nInstall: pix:amd64 (1.0)\n"
+        "End-Date: 2024-03-04  10:01:00\n",
+        "Start-Date: 2024-02-03  10:00:00\nUpgrade: firefox:amd64 (1, 2)\n"
+        "Error: Sub-process returned an error code\nEnd-Date: 2024-02-03  10:01:00\n",
+    ]
+    log_path = tmp_path / "history.log"
+    log_path.write_text("\n" + "\n".join(events))
+    assert tracker.scan_apt_history([str(log_path)]) == "2024-02-03"
+    for block_size in (1, 7, 64):
+        monkeypatch.setattr(Classes, "APT_HISTORY_BLOCK_SIZE", block_size)
+        assert tracker.scan_apt_history([str(log_path)]) == "2024-02-03"
+
+    gz_path = tmp_path / "history.log.1.gz"
+    with gzip.open(gz_path, "wt") as f:
+        f.write("\n".join(events[:1]))
+    assert tracker.scan_apt_history([str(gz_path), str(log_path)]) == "2024-02-03"
+    assert tracker.scan_apt_history([str(gz_path)]) == "2024-01-02"
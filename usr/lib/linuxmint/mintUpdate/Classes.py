@@ -4,13 +4,14 @@ import gi
 from gi.repository import Gio, GLib
 
 import datetime
+import functools
 import gettext
-import html
+import glob
+import gzip
 import json
 import os
-import subprocess
-import time
 import re
+import shutil
 
 gettext.install("mintupdate", "/usr/share/locale")
 
@@ -47,65 +48,153 @@ if CONFIGURED_KERNEL_TYPE not in SUPPORTED_KERNEL_TYPES:
 
 CONFIG_PATH = os.path.expanduser("~/.linuxmint/mintupdate")
 
-
+DISTRO_INFO_FILES = (
+    "/usr/share/distro-info/ubuntu.csv",
+    "/usr/share/distro-info/debian.csv",
+)
+_DATE_FMT = "%Y-%m-%d"
+
+# Origins which are shown under a different name
+ORIGIN_NAMES = {"Ubuntu": "ubuntu", "Debian": "debian"}
+# Sources whose updates are always treated as security updates
+SECURITY_SOURCES = frozenset(("firefox", "thunderbird", "chromium"))
+# Sources of kernel packages
+KERNEL_SOURCES = frozenset(("linux", "linux-kernel", "linux-signed", "linux-meta"))
+
+# Packages which should not be the main package of an update if the
+# update contains another package without the same suffix/prefix/keyword
+SECONDARY_PKG_SUFFIXES = (
+    "-dev",
+    "-dbg",
+    "-common",
+    "-core",
+    "-data",
+    "-doc",
+    ":i386",
+    ":amd64",
+)
+SECONDARY_PKG_PREFIXES = ("lib", "gir1.2")
+SECONDARY_PKG_KEYWORDS = ("-locale-", "-l10n-", "-help-")
+
+# End-Date of an APT history event containing an "Upgrade: " line. Events are
+# separated by empty lines, which the match never crosses.
+APT_UPGRADE_END_DATE_RE = re.compile(
+    r"Upgrade: [^\n]*(?:\n(?!End-Date:)[^\n]+)*\nEnd-Date:\s+(\d{4}-\d{2}-\d{2})"
+)
+# Size of the blocks in which the APT history logs are read
+APT_HISTORY_BLOCK_SIZE = 65536
+
+# Alias texts to translate, e.g. _("Firefox")
+TRANSLATABLE_ALIAS_RE = re.compile(r'_\("(.+)"\)')
+
+# Fields of an Update, as serialized by checkAPT.py (one JSON object per line)
+UPDATE_FIELDS = (
+    "display_name",
+    "source_name",
+    "real_source_name",
+    "source_packages",
+    "main_package_name",
+    "package_names",
+    "new_version",
+    "old_version",
+    "size",
+    "type",
+    "origin",
+    "short_description",
+    "description",
+    "site",
+    "archive",
+)
+
+# Parsed KernelVersion objects, keyed by version string. The same kernel
+# version is shared by its headers, image and modules packages, so each
+# distinct version only needs to be parsed once.
+_KVER_CACHE = {}
+
+
+@functools.lru_cache(maxsize=1)
 def get_release_dates():
-    """Get distro release dates for support duration calculation"""
+    """Get distro release dates for support duration calculation
+
+    The result is cached and shared between callers, it must not be modified.
+    """
     release_dates = {}
     distro_info = []
-    if os.path.isfile("/usr/share/distro-info/ubuntu.csv"):
-        distro_info += open("/usr/share/distro-info/ubuntu.csv", "r").readlines()
-    if os.path.isfile("/usr/share/distro-info/debian.csv"):
-        distro_info += open("/usr/share/distro-info/debian.csv", "r").readlines()
-    if distro_info:
-        for distro in distro_info[1:]:
-            try:
-                distro = distro.split(",")
-                release_date = time.mktime(time.strptime(distro[4], "%Y-%m-%d"))
-                release_date = datetime.datetime.fromtimestamp(release_date)
-                support_end = time.mktime(time.strptime(distro[5].rstrip(), "%Y-%m-%d"))
-                support_end = datetime.datetime.fromtimestamp(support_end)
-                release_dates[distro[2]] = [release_date, support_end]
-            except:
-                pass
+    for path in DISTRO_INFO_FILES:
+        try:
+            with open(path, "r") as csv_file:
+                distro_info += csv_file.read().splitlines()
+        except FileNotFoundError:
+            pass
+    for distro in distro_info[1:]:
+        try:
+            distro = distro.split(",", 6)
+            release_date = datetime.datetime.strptime(distro[4], _DATE_FMT)
+            support_end = datetime.datetime.strptime(distro[5].rstrip(), _DATE_FMT)
+            release_dates[distro[2]] = [release_date, support_end]
+        except:
+            pass
     return release_dates
 
 
+def _parse_version_id(version, field_length=3):
+    """Return the sortable tuple of zero-padded fields of a kernel version"""
+    elements = version.replace("-", ".").split(".")
+    # Check if mainline rc kernel to ensure proper sorting vs mainline release kernels
+    suffix = next((x for x in elements if x.startswith("rc")), None)
+    if not suffix:
+        suffix = "z"
+    # Copy numeric parts and fill them up to field_length
+    version_id = [x.zfill(field_length) for x in elements if x.isnumeric()]
+    # Installed kernels always have len(version_id) >= 4 at this point,
+    # create missing parts for not installed mainline kernels:
+    while len(version_id) < 3:
+        version_id.append("000")
+    if len(version_id) == 3:
+        parts = []
+        for x in version_id:
+            parts.append(x[0].lstrip("0"))
+            parts.append(x[1:])
+        parts.append(suffix)
+        version_id.append("".join(parts))
+    elif len(version_id[3]) == 6:
+        # installed release mainline kernel, add suffix for sorting
+        version_id[3] += suffix
+    return tuple(version_id)
+
+
+@functools.total_ordering
 class KernelVersion:
+    __slots__ = ("version", "version_id", "series", "shortseries")
+
     def __init__(self, version):
-        field_length = 3
         self.version = version
-        self.version_id = []
-        version_id = self.version.replace("-", ".").split(".")
-        # Check if mainline rc kernel to ensure proper sorting vs mainline release kernels
-        suffix = next((x for x in version_id if x.startswith("rc")), None)
-        if not suffix:
-            suffix = "z"
-        # Copy numeric parts from version_id to self.version_id and fill up to field_length
-        for element in version_id:
-            if element.isnumeric():
-                self.version_id.append("0" * (field_length - len(element)) + element)
-        # Installed kernels always have len(self.version_id) >= 4 at this point,
-        # create missing parts for not installed mainline kernels:
-        while len(self.version_id) < 3:
-            self.version_id.append("0" * field_length)
-        if len(self.version_id) == 3:
-            self.version_id.append(
-                "%s%s"
-                % (
-                    "".join(
-                        (
-                            x[: field_length - 2].lstrip("0") + x[field_length - 2 :]
-                            for x in self.version_id
-                        )
-                    ),
-                    suffix,
-                )
-            )
-        elif len(self.version_id[3]) == 6:
-            # installed release mainline kernel, add suffix for sorting
-            self.version_id[3] += suffix
-        self.series = tuple(self.version_id[:3])
-        self.shortseries = tuple(self.version_id[:2])
+        # Immutable, as parsed versions are shared through KernelVersion.get()
+        self.version_id = _parse_version_id(version)
+        self.series = self.version_id[:3]
+        self.shortseries = self.version_id[:2]
+
+    def __eq__(self, other):
+        if not isinstance(other, KernelVersion):
+            return NotImplemented
+        return self.version_id == other.version_id
+
+    def __lt__(self, other):
+        if not isinstance(other, KernelVersion):
+            return NotImplemented
+        return self.version_id < other.version_id
+
+    def __hash__(self):
+        return hash(self.version_id)
+
+    @classmethod
+    def get(cls, version):
+        """Return a shared, parsed KernelVersion for the given version string"""
+        kernel_version = _KVER_CACHE.get(version)
+        if kernel_version is None:
+            kernel_version = cls(version)
+            _KVER_CACHE[version] = kernel_version
+        return kernel_version
 
 
 class Update:
@@ -124,6 +213,10 @@ class Update:
                 self.old_version = ""
             else:
                 self.old_version = package.installed.version
+            if self.new_version == self.old_version:
+                # Nothing to update, callers must skip updates without a type
+                self.type = None
+                return
             self.size = package.candidate.size
             self.real_source_name = package.candidate.source_name
             if source_name is not None:
@@ -134,39 +227,32 @@ class Update:
             self.short_description = package.candidate.raw_description
             self.description = package.candidate.description
             self.archive = ""
-            if self.new_version != self.old_version:
-                self.type = "package"
-                self.origin = ""
-                for origin in package.candidate.origins:
-                    self.origin = origin.origin
-                    self.site = origin.site
-                    self.archive = origin.archive
-                    if origin.origin == "Ubuntu":
-                        self.origin = "ubuntu"
-                    elif origin.origin == "Debian":
-                        self.origin = "debian"
-                    elif origin.origin.startswith("LP-PPA"):
-                        self.origin = origin.origin
-                    if origin.origin == "Ubuntu" and "-security" in origin.archive:
-                        self.type = "security"
-                        break
-                    if origin.origin == "Debian" and "-Security" in origin.label:
-                        self.type = "security"
-                        break
-                    if source_name in ["firefox", "thunderbird", "chromium"]:
-                        self.type = "security"
+            self.type = "package"
+            self.origin = ""
+            is_security_source = source_name in SECURITY_SOURCES
+            for origin in package.candidate.origins:
+                self.origin = ORIGIN_NAMES.get(origin.origin, origin.origin)
+                self.site = origin.site
+                self.archive = origin.archive
+                if origin.origin == "Ubuntu" and "-security" in origin.archive:
+                    self.type = "security"
+                    break
+                if origin.origin == "Debian" and "-Security" in origin.label:
+                    self.type = "security"
+                    break
+                if is_security_source:
+                    self.type = "security"
+                    break
+                if origin.origin == "linuxmint":
+                    if origin.component == "romeo":
+                        self.type = "unstable"
                         break
-                    if origin.origin == "linuxmint":
-                        if origin.component == "romeo":
-                            self.type = "unstable"
-                            break
-                if (
-                    package.candidate.section == "kernel"
-                    or self.package_name.startswith("linux-headers")
-                    or self.real_source_name
-                    in ["linux", "linux-kernel", "linux-signed", "linux-meta"]
-                ):
-                    self.type = "kernel"
+            if (
+                package.candidate.section == "kernel"
+                or self.package_name.startswith("linux-headers")
+                or self.real_source_name in KERNEL_SOURCES
+            ):
+                self.type = "kernel"
         else:
             # Build the class from the input_string
             self.parse(input_string)
@@ -182,33 +268,29 @@ class Update:
             return
 
         if self.main_package_name != self.source_name:
+            main_name = self.main_package_name
+            # The tuple checks only filter out the common case of a main package
+            # without any of these suffixes/prefixes, the matching one must not
+            # be shared with the new package.
             # Overwrite dev, dbg, common, arch packages
-            for suffix in [
-                "-dev",
-                "-dbg",
-                "-common",
-                "-core",
-                "-data",
-                "-doc",
-                ":i386",
-                ":amd64",
-            ]:
-                if self.main_package_name.endswith(suffix) and not pkg.name.endswith(
-                    suffix
-                ):
-                    self.overwrite_main_package(pkg)
-                    return
+            if main_name.endswith(SECONDARY_PKG_SUFFIXES) and any(
+                main_name.endswith(suffix) and not pkg.name.endswith(suffix)
+                for suffix in SECONDARY_PKG_SUFFIXES
+            ):
+                self.overwrite_main_package(pkg)
+                return
             # Overwrite lib packages
-            for prefix in ["lib", "gir1.2"]:
-                if self.main_package_name.startswith(
-                    prefix
-                ) and not pkg.name.startswith(prefix):
-                    self.overwrite_main_package(pkg)
-                    return
-            for keyword in ["-locale-", "-l10n-", "-help-"]:
-                if (keyword in self.main_package_name) and (keyword not in pkg.name):
-                    self.overwrite_main_package(pkg)
-                    return
+            if main_name.startswith(SECONDARY_PKG_PREFIXES) and any(
+                main_name.startswith(prefix) and not pkg.name.startswith(prefix)
+                for prefix in SECONDARY_PKG_PREFIXES
+            ):
+                self.overwrite_main_package(pkg)
+                return
+            if any(
+                keyword in main_name and keyword not in pkg.name
+                for keyword in SECONDARY_PKG_KEYWORDS
+            ):
+                self.overwrite_main_package(pkg)
 
     def overwrite_main_package(self, pkg):
         self.description = pkg.candidate.description
@@ -216,80 +298,37 @@ class Update:
         self.main_package_name = pkg.name
 
     def serialize(self):
-        output_string = (
-            "###%s###%s###%s###%s###%s###%s###%s###%s###%s###%s###%s###%s###%s###%s###%s---EOL---"
-            % (
-                self.display_name,
-                self.source_name,
-                self.real_source_name,
-                ", ".join(self.source_packages),
-                self.main_package_name,
-                ", ".join(self.package_names),
-                self.new_version,
-                self.old_version,
-                self.size,
-                self.type,
-                self.origin,
-                self.short_description,
-                self.description,
-                self.site,
-                self.archive,
-            )
-        )
-        print(output_string.encode("ascii", "xmlcharrefreplace"))
+        record = {field: getattr(self, field) for field in UPDATE_FIELDS}
+        record["source_packages"] = list(self.source_packages)
+        print(json.dumps(record))
 
     def parse(self, input_string):
-        try:
-            input_string = html.unescape(input_string)
-        except:
-            pass
-        values = input_string.split("###")[1:]
-        (
-            self.display_name,
-            self.source_name,
-            self.real_source_name,
-            source_packages,
-            self.main_package_name,
-            package_names,
-            self.new_version,
-            self.old_version,
-            size,
-            self.type,
-            self.origin,
-            self.short_description,
-            self.description,
-            self.site,
-            self.archive,
-        ) = values
-        self.size = int(size)
-        self.package_names = package_names.split(", ")
-        self.source_packages = source_packages.split(", ")
+        record = json.loads(input_string)
+        for field in UPDATE_FIELDS:
+            setattr(self, field, record[field])
+        self.size = int(self.size)
 
 
 class Alias:
     def __init__(self, name, short_description, description):
+        self.name = self._process_text(name)
+        self.short_description = self._process_text(short_description)
+        self.description = self._process_text(description)
 
-        name = name.strip()
-        short_description = short_description.strip()
-        description = description.strip()
-
-        if name.startswith('_("') and name.endswith('")'):
-            name = _(name[3:-2])
-        if short_description.startswith('_("') and short_description.endswith('")'):
-            short_description = _(short_description[3:-2])
-        if description.startswith('_("') and description.endswith('")'):
-            description = _(description[3:-2])
-
-        self.name = name
-        self.short_description = short_description
-        self.description = description
+    # Strips the text and translates it if it is wrapped in _("...")
+    def _process_text(self, text):
+        text = text.strip()
+        match = TRANSLATABLE_ALIAS_RE.fullmatch(text)
+        if match:
+            return _(match.group(1))
+        return text
 
 
 class UpdateTracker:
 
     # Loads past updates from JSON file
     def __init__(self, settings, logger):
-        os.system("mkdir -p %s" % CONFIG_PATH)
+        os.makedirs(CONFIG_PATH, exist_ok=True)
         self.path = os.path.join(CONFIG_PATH, "updates.json")
 
         # Test case
@@ -298,15 +337,17 @@ class UpdateTracker:
             "MINTUPDATE_TEST"
         )
         if os.path.exists(test_path):
-            os.system("mkdir -p %s" % CONFIG_PATH)
-            os.system("cp %s %s" % (test_path, self.path))
+            shutil.copyfile(test_path, self.path)
             self.test_mode = True
 
-        self.tracker_version = 1  # version of the data structure
+        # version of the data structure, each update record is a
+        # [type, since, days] list since version 2
+        self.tracker_version = 2
         self.settings = settings
         self.tracked_updates = {}
-        self.refreshed_update_names = []  # updates which are seen in checkAPT
-        self.today = datetime.date.today().strftime("%Y.%m.%d")
+        self.refreshed_update_names = set()  # updates which are seen in checkAPT
+        self.today_date = datetime.date.today()
+        self.today = self.today_date.strftime("%Y.%m.%d")
         self.max_days = 0  # oldest update (in number of days seen)
         self.oldest_since_date = self.today  # oldest update (according to since date)
         self.active = True  # False if the tracking was already done today
@@ -316,6 +357,13 @@ class UpdateTracker:
         try:
             with open(self.path) as f:
                 self.tracked_updates = json.load(f)
+                if self.tracked_updates["version"] == 1:
+                    # Convert the dict records of version 1
+                    self.tracked_updates["updates"] = {
+                        name: [record["type"], record["since"], record["days"]]
+                        for name, record in self.tracked_updates["updates"].items()
+                    }
+                    self.tracked_updates["version"] = 2
                 if self.tracked_updates["version"] < self.tracker_version:
                     raise Exception()
                 if self.tracked_updates["checked"] > self.today:
@@ -334,76 +382,92 @@ class UpdateTracker:
 
     # Updates the record for a particular update
     def update(self, update):
-        self.refreshed_update_names.append(update.real_source_name)
-        if update.real_source_name not in self.tracked_updates["updates"]:
-            update_record = {}
-            update_record["type"] = update.type
-            update_record["since"] = self.today
-            update_record["days"] = 1
-            self.tracked_updates["updates"][update.real_source_name] = update_record
+        name = update.real_source_name
+        self.refreshed_update_names.add(name)
+        updates = self.tracked_updates["updates"]
+        update_record = updates.get(name)
+        if update_record is None:
+            update_record = [update.type, self.today, 1]
+            updates[name] = update_record
         else:
-            update_record = self.tracked_updates["updates"][update.real_source_name]
-            update_record["type"] = update.type
+            update_record[0] = update.type
             if self.today > self.tracked_updates["checked"]:
-                update_record["days"] += 1
+                update_record[2] += 1
 
         if update.type in ["security", "kernel"] or (not self.security_only):
-            if self.max_days < update_record["days"]:
-                self.max_days = update_record["days"]
-            if self.oldest_since_date > update_record["since"]:
-                self.oldest_since_date = update_record["since"]
+            (since, days) = update_record[1:]
+            if self.max_days < days:
+                self.max_days = days
+            if self.oldest_since_date > since:
+                self.oldest_since_date = since
 
     # Returns the number of days between today and the given date string
     def get_days_since_date(self, string: str, date_format: str) -> int:
         if string is None:
             return 999
-        datetime_object = datetime.datetime.strptime(string, date_format)
-        days = (datetime.date.today() - datetime_object.date()).days
+        if date_format == "%Y-%m-%d":
+            date = datetime.date.fromisoformat(string)
+        elif date_format == "%Y.%m.%d":
+            year, month, day = string.split(".")
+            date = datetime.date(int(year), int(month), int(day))
+        else:
+            date = datetime.datetime.strptime(string, date_format).date()
+        days = (self.today_date - date).days
         return days
 
     # Returns the number of days between today and the given timestamp
     def get_days_since_timestamp(self, timestamp: float) -> int:
         if timestamp == 0:
             return 999
-        datetime_object = datetime.datetime.fromtimestamp(timestamp)
-        days = (datetime.date.today() - datetime_object.date()).days
+        date = datetime.date.fromtimestamp(timestamp)
+        days = (self.today_date - date).days
         return days
 
+    # Returns the latest End-Date (YYYY-MM-DD) of an APT history event
+    # containing upgrades, in the given (possibly gzipped) logs
+    def scan_apt_history(self, paths):
+        latest_upgrade_date = None
+        for path in paths:
+            opener = gzip.open if path.endswith(".gz") else open
+            with opener(path, "rt", errors="replace") as log:
+                for events in self.read_apt_history_events(log):
+                    for end_date in APT_UPGRADE_END_DATE_RE.findall(events):
+                        if latest_upgrade_date is None or end_date > latest_upgrade_date:
+                            latest_upgrade_date = end_date
+        return latest_upgrade_date
+
+    # Yields the complete events of an APT history log, a block at a time.
+    # Events never span an empty line, so each block ends at the last one and
+    # the rest is carried over to the next block.
+    def read_apt_history_events(self, log):
+        pending = ""
+        while True:
+            block = log.read(APT_HISTORY_BLOCK_SIZE)
+            if not block:
+                yield pending
+                return
+            pending += block
+            boundary = pending.rfind("\n\n")
+            if boundary != -1:
+                yield pending[:boundary]
+                pending = pending[boundary + 2 :]
+
     def get_latest_apt_upgrade(self):
         latest_upgrade_date = None
 
         if os.path.exists("/var/log/apt/history.log"):
-            logs = subprocess.getoutput("cat /var/log/apt/history.log")
-            for event in logs.split("\n\n"):
-                if "Upgrade: " not in event:
-                    continue
-                end_date = None
-                for line in event.split("\n"):
-                    line = line.strip()
-                    if line.startswith("End-Date: "):
-                        end_date = line.replace("End-Date: ", "")
-                        end_date = end_date.split()[0]
-                if end_date is not None and (
-                    latest_upgrade_date is None or end_date > latest_upgrade_date
-                ):
-                    latest_upgrade_date = end_date
+            try:
+                latest_upgrade_date = self.scan_apt_history(
+                    ["/var/log/apt/history.log"]
+                )
+            except Exception as e:
+                print("Failed to check the APT log", e)
 
         if latest_upgrade_date is None:
             try:
-                logs = subprocess.getoutput("zcat /var/log/apt/history.log*gz")
-                for event in logs.split("\n\n"):
-                    if "Upgrade: " not in event:
-                        continue
-                    end_date = None
-                    for line in event.split("\n"):
-                        line = line.strip()
-                        if line.startswith("End-Date: "):
-                            end_date = line.replace("End-Date: ", "")
-                            end_date = end_date.split()[0]
-                    if end_date is not None and (
-                        latest_upgrade_date is None or end_date > latest_upgrade_date
-                    ):
-                        latest_upgrade_date = end_date
+                latest_upgrade_date = self.scan_apt_history(
+                    sorted(glob.glob("/var/log/apt/history.log*gz"))
+                )
             except Exception as e:
                 print("Failed to check compressed APT logs", e)
 
@@ -412,15 +476,23 @@ class UpdateTracker:
     # Returns true if a notification is required and updates the tracker
     # with the new notification date
     def notify(self):
+        settings = self.settings
         # Check notification enabled
-        if self.settings.get_boolean("tracker-disable-notifications"):
+        if settings.get_boolean("tracker-disable-notifications"):
             return False
+        days_between_notifications = settings.get_int(
+            "tracker-days-between-notifications"
+        )
+        max_days = settings.get_int("tracker-max-days")
+        max_age = settings.get_int("tracker-max-age")
+        grace_period = settings.get_int("tracker-grace-period")
+        install_last_run = settings.get_int("install-last-run")
 
         # Check notification age
         notified_age = self.get_days_since_date(
             self.tracked_updates["notified"], "%Y.%m.%d"
         )
-        if notified_age < self.settings.get_int("tracker-days-between-notifications"):
+        if notified_age < days_between_notifications:
             self.logger.write(
                 "Tracker: Notification age is too small: %d days" % notified_age
             )
@@ -429,22 +501,20 @@ class UpdateTracker:
         notification_needed = False
 
         # Check maximum logged-in days
-        if self.max_days >= self.settings.get_int("tracker-max-days"):
+        if self.max_days >= max_days:
             self.logger.write("Tracker: Max days reached: %d days" % self.max_days)
             notification_needed = True
         else:
-            max_age = self.get_days_since_date(self.oldest_since_date, "%Y.%m.%d")
+            oldest_age = self.get_days_since_date(self.oldest_since_date, "%Y.%m.%d")
             # Check maximum update age
-            if max_age >= self.settings.get_int("tracker-max-age"):
-                self.logger.write("Tracker: Max age reached: %d days" % max_age)
+            if oldest_age >= max_age:
+                self.logger.write("Tracker: Max age reached: %d days" % oldest_age)
                 notification_needed = True
 
         if not self.test_mode:
             # Check last time install button was pressed
-            last_install_age = self.get_days_since_timestamp(
-                self.settings.get_int("install-last-run")
-            )
-            if last_install_age <= self.settings.get_int("tracker-grace-period"):
+            last_install_age = self.get_days_since_timestamp(install_last_run)
+            if last_install_age <= grace_period:
                 self.logger.write(
                     "Tracker: Mintupdate update button was pressed recently: %d days ago"
                     % last_install_age
@@ -456,9 +526,7 @@ class UpdateTracker:
                 last_apt_upgrade_age = self.get_days_since_date(
                     last_apt_upgrade, "%Y-%m-%d"
                 )
-                if last_apt_upgrade_age <= self.settings.get_int(
-                    "tracker-grace-period"
-                ):
+                if last_apt_upgrade_age <= grace_period:
                     self.logger.write(
                         "Tracker: APT upgrades were taken recently: %d days ago"
                         % last_apt_upgrade_age
@@ -474,14 +542,14 @@ class UpdateTracker:
     # Records updates in JSON file and potentially notify
     def record(self):
         # Purge non-refreshed updates
-        for name in list(self.tracked_updates["updates"].keys()):
-            if name not in self.refreshed_update_names:
-                del self.tracked_updates["updates"][name]
+        updates = self.tracked_updates["updates"]
+        for name in updates.keys() - self.refreshed_update_names:
+            del updates[name]
         # Update the check date
         self.tracked_updates["checked"] = self.today
         # Write JSON
         with open(self.path, "w") as f:
-            json.dump(self.tracked_updates, f, indent=2)
+            json.dump(self.tracked_updates, f, separators=(",", ":"))
 
 
 try:
@@ -492,6 +560,31 @@ except:
 
 
 class FlatpakUpdate:
+    __slots__ = (
+        "op",
+        "installed_ref",
+        "remote_ref",
+        "pkginfo",
+        "ref",
+        "ref_name",
+        "metadata",
+        "size",
+        "link",
+        "flatpak_type",
+        "old_version",
+        "new_version",
+        "name",
+        "summary",
+        "description",
+        "real_source_name",
+        "source_packages",
+        "package_names",
+        "sub_updates",
+        "origin",
+        "type",
+        "built_extensions",
+    )
+
     def __init__(
         self,
         op=None,
@@ -534,6 +627,9 @@ class FlatpakUpdate:
         self.origin = ""
         ##################
 
+        # parsed lazily from the metadata by the update worker
+        self.built_extensions = None
+
         # ideal:           old-version                     new-version
         # versions same:   old-version (commit)            new-version (commit)
         # no versions      commit                          commit
@@ -603,32 +699,28 @@ class FlatpakUpdate:
         # self.source_packages.append("%s=%s" % (update.ref_name, update.new_version))
 
     def to_json(self):
-        trimmed_dict = {}
-
-        for key in (
-            "flatpak_type",
-            "name",
-            "origin",
-            "old_version",
-            "new_version",
-            "size",
-            "summary",
-            "description",
-            "real_source_name",
-            "source_packages",
-            "package_names",
-            "sub_updates",
-            "link",
-        ):
-            trimmed_dict[key] = self.__dict__[key]
-        trimmed_dict["metadata"] = self.metadata.to_data()[0]
-        trimmed_dict["ref"] = self.ref.format_ref()
-
-        return trimmed_dict
+        return {
+            "flatpak_type": self.flatpak_type,
+            "name": self.name,
+            "origin": self.origin,
+            "old_version": self.old_version,
+            "new_version": self.new_version,
+            "size": self.size,
+            "summary": self.summary,
+            "description": self.description,
+            "real_source_name": self.real_source_name,
+            "source_packages": self.source_packages,
+            "package_names": self.package_names,
+            "sub_updates": self.sub_updates,
+            "link": self.link,
+            "metadata": self.metadata.to_data()[0],
+            "ref": self.ref.format_ref(),
+        }
 
     @classmethod
     def from_json(cls, json_data: dict):
-        inst = cls()
+        # Bypass __init__, which builds the update from a transaction operation
+        inst = object.__new__(cls)
         inst.flatpak_type = json_data["flatpak_type"]
         inst.ref = Flatpak.Ref.parse(json_data["ref"])
         inst.ref_name = inst.ref.get_name()
@@ -644,6 +736,7 @@ class FlatpakUpdate:
         inst.package_names = json_data["package_names"]
         inst.sub_updates = json_data["sub_updates"]
         inst.link = json_data["link"]
+        inst.built_extensions = None
         inst.metadata = GLib.KeyFile()
 
         try:
@@ -5,9 +5,11 @@ import subprocess
 import logging
 import sys
 
+LOG_FILE = "/var/log/mintupdate.log"
+
 # Configure logging
 logging.basicConfig(
-    filename="/var/log/mintupdate.log",
+    filename=LOG_FILE,
     level=logging.INFO,
     format="%(asctime)s - %(levelname)s - %(message)s",
 )
@@ -26,13 +28,16 @@ FAILURE = 1
 def is_power_connected():
     """Check if the power supply is connected."""
     try:
-        with open(POWER_CONNECT_FILE) as power_supply_file:
-            return power_supply_file.read().strip() == "1"
+        fd = os.open(POWER_CONNECT_FILE, os.O_RDONLY)
+        try:
+            return os.read(fd, 8).strip() == b"1"
+        finally:
+            os.close(fd)
     except FileNotFoundError:
-        logging.warning(f"{POWER_CONNECT_FILE} not found. Ignoring power supply check.")
+        logging.warning("%s not found. Ignoring power supply check.", POWER_CONNECT_FILE)
         return True
     except IOError as e:
-        logging.error(f"IOError reading {POWER_CONNECT_FILE}: {e}")
+        logging.error("IOError reading %s: %s", POWER_CONNECT_FILE, e)
         return False
 
 
@@ -41,15 +46,16 @@ def get_upgrade_arguments():
     arguments = []
     if os.path.isfile(OPTIONS_FILE):
         try:
-            with open(OPTIONS_FILE) as options:
-                for line in options:
-                    line = line.strip()
-                    if line and not line.startswith("#"):
-                        arguments.append(line)
+            with open(OPTIONS_FILE, buffering=65536) as options:
+                arguments = [
+                    line
+                    for line in map(str.strip, options)
+                    if line and not line.startswith("#")
+                ]
         except Exception as e:
-            logging.error(f"Error reading {OPTIONS_FILE}: {e}")
+            logging.error("Error reading %s: %s", OPTIONS_FILE, e)
     else:
-        logging.warning(f"{OPTIONS_FILE} does not exist.")
+        logging.warning("%s does not exist.", OPTIONS_FILE)
     return arguments
 
 
@@ -58,18 +64,19 @@ def create_symlink():
     try:
         if os.path.islink(PKLA_TARGET):
             logging.info(
-                f"{PKLA_TARGET} already exists as a symlink. Skipping symlink creation."
+                "%s already exists as a symlink. Skipping symlink creation.",
+                PKLA_TARGET,
             )
         elif os.path.exists(PKLA_TARGET):
             logging.error(
-                f"{PKLA_TARGET} exists but is not a symlink. Cannot create symlink."
+                "%s exists but is not a symlink. Cannot create symlink.", PKLA_TARGET
             )
             return FAILURE
         else:
             os.symlink(PKLA_SOURCE, PKLA_TARGET)
-            logging.info(f"Created symlink from {PKLA_SOURCE} to {PKLA_TARGET}.")
+            logging.info("Created symlink from %s to %s.", PKLA_SOURCE, PKLA_TARGET)
     except OSError as e:
-        logging.error(f"Error creating symlink {PKLA_SOURCE} -> {PKLA_TARGET}: {e}")
+        logging.error("Error creating symlink %s -> %s: %s", PKLA_SOURCE, PKLA_TARGET, e)
         return FAILURE
     return SUCCESS
 
@@ -79,13 +86,13 @@ def remove_symlink():
     try:
         if os.path.islink(PKLA_TARGET):
             os.unlink(PKLA_TARGET)
-            logging.info(f"Removed symlink {PKLA_TARGET}.")
+            logging.info("Removed symlink %s.", PKLA_TARGET)
         else:
             logging.info(
-                f"{PKLA_TARGET} does not exist or is not a symlink. Skipping removal."
+                "%s does not exist or is not a symlink. Skipping removal.", PKLA_TARGET
             )
     except Exception as e:
-        logging.error(f"Error removing symlink: {e}")
+        logging.error("Error removing symlink: %s", e)
 
 
 def run_upgrade_command(arguments):
@@ -103,17 +110,19 @@ def run_upgrade_command(arguments):
     ]
     cmd.extend(arguments)
 
-    logging.info(f"Running command: {' '.join(cmd)}")
+    logging.info("Running command: %s", cmd)
+    # The output of mintupdate-cli goes straight to the log file
+    log_fd = os.open(LOG_FILE, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
     try:
-        result = subprocess.run(
-            cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, check=True
-        )
-        logging.info(f"mintupdate-cli output: {result.stdout.decode()}")
+        subprocess.run(cmd, stdout=log_fd, stderr=log_fd, check=True)
     except subprocess.CalledProcessError as e:
         logging.error(
-            f"mintupdate-cli failed with return code {e.returncode}. Error: {e.stderr.decode()}"
+            "mintupdate-cli failed with return code %s, see its output above.",
+            e.returncode,
         )
         return e.returncode
+    finally:
+        os.close(log_fd)
     return SUCCESS
 
 
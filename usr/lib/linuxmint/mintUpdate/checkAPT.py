@@ -85,7 +85,8 @@ class APTCheck():
             if shortname not in meta_names:
                 meta_names.append(shortname)
         try:
-            # Get the uname version
+            # Get the uname version (not taken from the shared pool
+            # because its series may be overridden below)
             active_kernel = KernelVersion(os.uname().release)
 
             # Override installed kernel if not of the configured type
@@ -105,7 +106,7 @@ class APTCheck():
             for meta_name in meta_names:
                 if meta_name in self.cache:
                     meta = self.cache[meta_name]
-                    meta_kernel = KernelVersion(meta.candidate.version)
+                    meta_kernel = KernelVersion.get(meta.candidate.version)
                     if (active_kernel.series > meta_kernel.series):
                         # Meta is lower than the installed kernel series, ignore
                         continue
@@ -122,13 +123,13 @@ class APTCheck():
                         if active_kernel.series == meta_kernel.series:
                             # same series
                             if (not meta_candidate_same_series or meta_kernel.version_id >
-                                KernelVersion(meta_candidate_same_series.candidate.version).version_id
+                                KernelVersion.get(meta_candidate_same_series.candidate.version).version_id
                                 ):
                                 meta_candidate_same_series = meta
                         else:
                             # higher series
                             if (not meta_candidate_higher_series or meta_kernel.version_id >
-                                KernelVersion(meta_candidate_higher_series.candidate.version).version_id
+                                KernelVersion.get(meta_candidate_higher_series.candidate.version).version_id
                                 ):
                                 meta_candidate_higher_series = meta
 
@@ -146,7 +147,7 @@ class APTCheck():
                 if meta_candidate_higher_series.name != lts_meta_name:
                     if lts_meta_name in self.cache:
                         lts_meta = self.cache[lts_meta_name]
-                        lts_meta_kernel = KernelVersion(lts_meta.candidate.version)
+                        lts_meta_kernel = KernelVersion.get(lts_meta.candidate.version)
                         if active_kernel.series < lts_meta_kernel.series:
                             meta_candidate_higher_series = lts_meta
                 self.add_update(meta_candidate_higher_series, kernel_update=True)
@@ -158,7 +159,7 @@ class APTCheck():
             for pkgname in self.cache.keys():
                 match = re.match(r'^(?:linux-image-)(\d.+?)%s$' % active_kernel_type, pkgname)
                 if match:
-                    kernel = KernelVersion(match.group(1))
+                    kernel = KernelVersion.get(match.group(1))
                     if kernel.series == max_kernel.series and kernel.version_id > max_kernel.version_id:
                         max_kernel = kernel
             if max_kernel.version_id != active_kernel.version_id:
@@ -235,6 +236,8 @@ class APTCheck():
                     update.old_version = package.installed.version
             else:
                 update = Update(package, source_name=source_name)
+                if update.type is None:
+                    return
                 self.updates[source_name] = update
             if kernel_update:
                 update.type = "kernel"
@@ -290,10 +293,11 @@ class APTCheck():
                                         try:
                                             # clean short description
                                             value = line
-                                            try:
-                                                value = html.unescape(value)
-                                            except:
-                                                print ("Unable to unescape '%s'" % value)
+                                            if "&" in value:
+                                                try:
+                                                    value = html.unescape(value)
+                                                except:
+                                                    print ("Unable to unescape '%s'" % value)
                                             # Remove "Description-xx: " prefix
                                             value = re.sub(r'Description-(\S+): ', r'', value)
                                             # Only take the first line and trim it
@@ -313,10 +317,11 @@ class APTCheck():
                                     else:
                                         description = "\n" + line
                                         try:
-                                            try:
-                                                description = html.unescape(description)
-                                            except:
-                                                print ("Unable to unescape '%s'" % description)
+                                            if "&" in description:
+                                                try:
+                                                    description = html.unescape(description)
+                                                except:
+                                                    print ("Unable to unescape '%s'" % description)
                                             dlines = description.split("\n")
                                             value = ""
                                             num = 0
@@ -394,7 +399,7 @@ if __name__ == "__main__":
         check.serialize_updates()
         check.update_cache()
     except Exception as error:
-        print("CHECK_APT_ERROR---EOL---")
+        print("CHECK_APT_ERROR")
         print(sys.exc_info()[0])
         print("Error: %s" % error)
         traceback.print_exc()
@@ -24,12 +24,16 @@ def initialize_apt():
 def process_packages(selection, depcache, cache):
     packages_to_install = set()
     packages_to_remove = set()
+    selection_set = set(selection)
 
     try:
+        # The action group defers the depcache bookkeeping until all the
+        # packages are marked, broken dependencies are fixed once below
         with apt_pkg.ActionGroup(depcache):
             for package in selection:
                 if package in cache:
                     pkg = cache[package]
+                    # auto_inst and from_user default to True (positional only)
                     depcache.mark_install(pkg)
                     logging.info(f"Marked for installation: {pkg.name}")
                 else:
@@ -45,20 +49,14 @@ def process_packages(selection, depcache, cache):
 
     try:
         for pkg in cache.packages:
-            is_marked_install = depcache.marked_install(pkg) or depcache.marked_upgrade(
-                pkg
-            )
-            is_marked_delete = depcache.marked_delete(pkg)
-
-            if (
-                not depcache.marked_keep(pkg)
-                and is_marked_install
-                and pkg.name not in selection
-            ):
-                packages_to_install.add(pkg.name)
-
-            if is_marked_delete:
+            # The marks are exclusive and an install or upgrade mark means
+            # the package isn't kept, so marked_keep() isn't needed
+            if depcache.marked_delete(pkg):
                 packages_to_remove.add(pkg.name)
+            elif (
+                depcache.marked_install(pkg) or depcache.marked_upgrade(pkg)
+            ) and pkg.name not in selection_set:
+                packages_to_install.add(pkg.name)
 
     except Exception as e:
         logging.error(f"Error processing packages: {e}")
@@ -19,7 +19,7 @@ from mintcommon.installer import installer
 from mintcommon.installer import _flatpak
 from Classes import FlatpakUpdate
 
-CHUNK_SIZE = 4096
+CHUNK_SIZE = 65536
 LOG_PATH = os.path.join(
     GLib.get_home_dir(), ".linuxmint", "mintupdate", "flatpak-updates.log"
 )
@@ -42,6 +42,12 @@ def warn(*args):
     print(f"flatpak-update-worker (WARN): {argstr}", file=sys.stderr, flush=True)
 
 
+@functools.lru_cache(maxsize=256)
+def _parse_ref(ref_str):
+    """Parse a Flatpak ref string, runtimes are shared by many updates."""
+    return Flatpak.Ref.parse(ref_str)
+
+
 class FlatpakUpdateWorker:
     def __init__(self):
         self.installer = installer.Installer(installer.PKG_TYPE_FLATPAK)
@@ -50,6 +56,8 @@ class FlatpakUpdateWorker:
         self.cancellable = Gio.Cancellable()
         self.stdin = Gio.UnixInputStream.new(sys.stdin.fileno(), True)
         self.updates = []
+        # Position of the top-level updates by ref name, for finding parents
+        self.update_index_by_name = {}
 
         if not self.check_for_any_installed():
             self.send_to_updater("no-installed")
@@ -59,7 +67,12 @@ class FlatpakUpdateWorker:
     def check_for_any_installed(self):
         """Check if there are any installed Flatpak applications."""
         try:
-            installed = self.fp_sys.list_installed_refs(self.cancellable)
+            # Apps are usually there, only list the runtimes without them
+            installed = self.fp_sys.list_installed_refs_by_kind(
+                Flatpak.RefKind.APP, self.cancellable
+            ) or self.fp_sys.list_installed_refs_by_kind(
+                Flatpak.RefKind.RUNTIME, self.cancellable
+            )
         except GLib.Error as e:
             warn(f"GLib error while listing installed refs: {str(e)}")
             installed = []
@@ -71,7 +84,7 @@ class FlatpakUpdateWorker:
             debug("No Flatpaks installed, exiting without refreshing")
             return False
 
-        debug(f"{len(installed)} Flatpaks installed, continuing")
+        debug("Flatpaks installed, continuing")
         return True
 
     def refresh(self, init=True):
@@ -103,6 +116,7 @@ class FlatpakUpdateWorker:
         _flatpak._initialize_appstream_thread()
 
         self.updates = []
+        self.update_index_by_name = {}
         self.installer.select_flatpak_updates(
             None,
             self._fetch_task_ready,
@@ -121,7 +135,12 @@ class FlatpakUpdateWorker:
 
         if not self.error and task.transaction:
             self._process_fetch_task(task)
-            out = json.dumps(self.updates, default=lambda o: o.to_json(), indent=4)
+            out = json.dumps(
+                self.updates,
+                default=lambda o: o.to_json(),
+                ensure_ascii=False,
+                separators=(",", ":"),
+            )
             self.send_to_updater(out)
         else:
             if self.error:
@@ -137,18 +156,12 @@ class FlatpakUpdateWorker:
     def _process_fetch_task(self, task):
         """Process the fetch task to extract updates."""
         trans = task.transaction
-        ops = trans.get_operations()
-
-        def cmp_ref_name(a, b):
-            ref_a = Flatpak.Ref.parse(a.get_ref())
-            ref_b = Flatpak.Ref.parse(b.get_ref())
-            return len(ref_a.get_name().split(".")) - len(ref_b.get_name().split("."))
+        # Parse each ref once and sort by name, so parents come before
+        # their extensions (the sort is stable for identical names)
+        ops = [(op, _parse_ref(op.get_ref())) for op in trans.get_operations()]
+        ops.sort(key=lambda op_ref: op_ref[1].get_name())
 
-        ops.sort(key=functools.cmp_to_key(cmp_ref_name))
-        ops.sort(key=lambda op: Flatpak.Ref.parse(op.get_ref()).get_name())
-
-        for op in ops:
-            ref = Flatpak.Ref.parse(op.get_ref())
+        for op, ref in ops:
             debug(f"Operation: {op.get_ref()}")
 
             if op.get_operation_type() == Flatpak.TransactionOperationType.UPDATE:
@@ -180,7 +193,7 @@ class FlatpakUpdateWorker:
             )
 
             if self.is_base_package(update) or not self.add_to_parent_update(update):
-                self.updates.append(update)
+                self.add_update(update)
         except Exception as e:
             warn(f"Problem creating FlatpakUpdate for {ref.format_ref()}: {e}")
 
@@ -206,30 +219,56 @@ class FlatpakUpdateWorker:
             update = FlatpakUpdate(op, self.installer, ref, None, remote_ref, pkginfo)
 
             if self.is_base_package(update) or not self.add_to_parent_update(update):
-                self.updates.append(update)
+                self.add_update(update)
         except Exception as e:
             warn(f"Problem creating FlatpakUpdate for {ref.format_ref()}: {e}")
 
+    def add_update(self, update):
+        """Add a top-level update."""
+        self.update_index_by_name.setdefault(update.ref_name, len(self.updates))
+        self.updates.append(update)
+
     def add_to_parent_update(self, update):
         """Add the update to a parent update if applicable."""
-        for maybe_parent in self.updates:
-            if update.ref_name.startswith(maybe_parent.ref_name):
-                maybe_parent.add_package(update)
-                return True
+        # The first update in the list whose name is a prefix of this one,
+        # found by looking up every prefix instead of comparing with each
+        name = update.ref_name
+        prefix_index = min(
+            (
+                index
+                for index in (
+                    self.update_index_by_name.get(name[:end])
+                    for end in range(1, len(name) + 1)
+                )
+                if index is not None
+            ),
+            default=len(self.updates),
+        )
 
+        # An earlier update which builds it as an extension still comes first
+        for index in range(prefix_index):
+            maybe_parent = self.updates[index]
             if self._is_extension_for_parent(maybe_parent, update):
                 maybe_parent.add_package(update)
                 return True
 
+        if prefix_index < len(self.updates):
+            self.updates[prefix_index].add_package(update)
+            return True
+
         return False
 
     def _is_extension_for_parent(self, parent, update):
         """Check if the update is an extension for the parent package."""
-        try:
-            kf = parent.metadata
-            built_extensions = kf.get_string_list("Build", "built-extensions")
-        except Exception:
-            built_extensions = self._parse_group_extensions(parent.metadata)
+        # Parsed once per parent, it is checked against every later update
+        built_extensions = parent.built_extensions
+        if built_extensions is None:
+            try:
+                kf = parent.metadata
+                built_extensions = kf.get_string_list("Build", "built-extensions")
+            except Exception:
+                built_extensions = self._parse_group_extensions(parent.metadata)
+            parent.built_extensions = built_extensions
 
         return any(update.ref_name.startswith(ext) for ext in built_extensions)
 
@@ -247,7 +286,7 @@ class FlatpakUpdateWorker:
         try:
             kf = update.metadata
             runtime_ref_id = f"runtime/{kf.get_string('Runtime', 'runtime')}"
-            runtime_ref = Flatpak.Ref.parse(runtime_ref_id)
+            runtime_ref = _parse_ref(runtime_ref_id)
             return name == runtime_ref.get_name()
         except Exception:
             return False
@@ -306,9 +345,8 @@ class FlatpakUpdateWorker:
             entries = task.get_transaction_log()
             directory = Path(LOG_PATH).parent
             os.makedirs(directory, exist_ok=True)
-            with open(LOG_PATH, "a") as f:
-                for entry in entries:
-                    f.write(f"{entry}\n")
+            with open(LOG_PATH, "a", buffering=131072) as f:
+                f.writelines(f"{entry}\n" for entry in entries)
         except Exception as e:
             warn(f"Can't write to flatpak update log: {e}")
 
@@ -376,6 +414,11 @@ if __name__ == "__main__":
         help="Get a JSON list of update info.",
         action="store_true",
     )
+    parser.add_argument(
+        "--refresh-and-fetch",
+        help="Refresh, then get a JSON list of update info, in a single run.",
+        action="store_true",
+    )
     parser.add_argument(
         "-u",
         "--update-packages",
@@ -392,6 +435,10 @@ if __name__ == "__main__":
     try:
         if args.refresh:
             updater.refresh()
+            updater.quit()
+        elif args.refresh_and_fetch:
+            updater.refresh()
+            updater.fetch_updates()
         elif args.fetch_updates:
             updater.fetch_updates()
         elif args.update_packages:
@@ -2,6 +2,7 @@
 
 import os
 import json
+import signal
 import subprocess
 import sys
 import gi
@@ -86,9 +87,20 @@ class FlatpakUpdater:
         self.kill_any_helpers()
         self.run_subprocess([UPDATE_WORKER_PATH, "--refresh"])
 
-    def fetch_updates(self):
+    def fetch_updates(self, refresh=False):
         self.kill_any_helpers()
-        output = self.run_subprocess([UPDATE_WORKER_PATH, "--fetch-updates"])
+        output = None
+        if refresh:
+            # Refresh in the same worker, instead of starting one for each step
+            output = self.run_subprocess(
+                [UPDATE_WORKER_PATH, "--refresh-and-fetch"], timeout=60
+            )
+            if output is None:
+                # Don't lose the update list to a slow or failed refresh
+                logging.info("Flatpaks: refresh failed, fetching updates without it")
+                self.kill_any_helpers()
+        if output is None:
+            output = self.run_subprocess([UPDATE_WORKER_PATH, "--fetch-updates"])
 
         if not output:
             logging.info("Flatpaks: no updates")
@@ -170,16 +182,24 @@ class FlatpakUpdater:
             self.proc = None
 
     def kill_any_helpers(self):
-        try:
-            subprocess.run(["pkill", "-f", "flatpak-update-worker"], check=True)
-        except subprocess.CalledProcessError as e:
-            logging.error(f"Error killing helpers: {e}")
+        # Same as pkill -f, without spawning it
+        own_pid = os.getpid()
+        for pid in os.listdir("/proc"):
+            if not pid.isdigit() or int(pid) == own_pid:
+                continue
+            try:
+                with open(f"/proc/{pid}/cmdline", "rb") as f:
+                    cmdline = f.read()
+                if b"flatpak-update-worker" in cmdline:
+                    os.kill(int(pid), signal.SIGTERM)
+            except OSError:
+                # The process exited or isn't ours
+                pass
 
 
 if __name__ == "__main__":
     updater = FlatpakUpdater()
-    updater.refresh()
-    updater.fetch_updates()
+    updater.fetch_updates(refresh=True)
     if updater.updates:
         updater.prepare_start_updates(updater.updates)
         if updater.confirm_start():
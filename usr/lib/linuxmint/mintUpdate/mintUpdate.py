@@ -517,7 +517,9 @@ class ChangelogRetriever(threading.Thread):
                             changelog = changelog + change + "\n"
                 elif "launchpad.net" in changelog_source:
                     changes = (
-                        source.split("Changes:")[1].split("Checksums")[0].split("\n")
+                        source.split("Changes:", 1)[1]
+                        .split("Checksums", 1)[0]
+                        .split("\n")
                     )
                     for change in changes:
                         stripped_change = change.strip()
@@ -1242,16 +1244,6 @@ class RefreshThread(threading.Thread):
                                 % (spice_type, traceback.format_exc())
                             )
 
-            if FLATPAK_SUPPORT:
-                if self.root_mode:
-                    self.application.logger.write(
-                        "Refreshing available Flatpak updates"
-                    )
-                    self.application.set_status_message_from_thread(
-                        _("Checking for Flatpak updates")
-                    )
-                    self.application.flatpak_updater.refresh()
-
             self.application.set_status_message_from_thread(_("Processing updates"))
 
             if os.getenv("MINTUPDATE_TEST") is None:
@@ -1366,10 +1358,10 @@ class RefreshThread(threading.Thread):
             download_size = 0
             is_self_update = False
             tracker = UpdateTracker(self.application.settings, self.application.logger)
-            lines = output.split("---EOL---")
+            lines = output.splitlines()
             if len(lines):
                 for line in lines:
-                    if "###" not in line:
+                    if not line.startswith("{"):
                         continue
 
                     # Create update object
@@ -1546,6 +1538,19 @@ class RefreshThread(threading.Thread):
                     num_visible += 1
                     download_size += update.size
 
+            if (
+                FLATPAK_SUPPORT
+                and self.application.flatpak_updater
+                and is_self_update
+                and self.root_mode
+            ):
+                # No Flatpak updates are listed for a self-update, only refresh
+                self.application.logger.write("Refreshing available Flatpak updates")
+                self.application.set_status_message_from_thread(
+                    _("Checking for Flatpak updates")
+                )
+                self.application.flatpak_updater.refresh()
+
             if (
                 FLATPAK_SUPPORT
                 and self.application.flatpak_updater
@@ -1554,7 +1559,15 @@ class RefreshThread(threading.Thread):
                 type_sort_key = 5
                 blacklist = self.application.settings.get_strv("blacklisted-packages")
 
-                self.application.flatpak_updater.fetch_updates()
+                if self.root_mode:
+                    # The Flatpak refresh and the update list share one worker run
+                    self.application.logger.write(
+                        "Refreshing available Flatpak updates"
+                    )
+                    self.application.set_status_message_from_thread(
+                        _("Checking for Flatpak updates")
+                    )
+                self.application.flatpak_updater.fetch_updates(refresh=self.root_mode)
                 if self.application.flatpak_updater.error is None:
                     for update in self.application.flatpak_updater.updates:
                         update.type = "flatpak"
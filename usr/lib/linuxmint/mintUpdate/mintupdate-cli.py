@@ -2,7 +2,9 @@
 
 import argparse
 import fnmatch
+import functools
 import os
+import re
 import subprocess
 import sys
 import traceback
@@ -17,13 +19,34 @@ logging.basicConfig(
 )
 
 
-def is_blacklisted(blacklisted_packages, source_name, version):
+# Set of the priority update source names, for membership tests
+PRIORITY_SOURCE_NAMES = frozenset(PRIORITY_UPDATES)
+
+BLACKLIST_FILE = "/etc/mintupdate.blacklist"
+# Entries of the blacklist file, reused while its mtime doesn't change
+_blacklist_cache = {"mtime": None, "entries": frozenset()}
+
+# Characters which make a blacklist entry a glob pattern (see fnmatch)
+GLOB_CHARS = "*?["
+
+
+@functools.lru_cache(maxsize=None)
+def compile_glob(pattern):
+    """Compile a blacklist glob pattern, once per pattern."""
+    return re.compile(fnmatch.translate(pattern))
+
+
+def is_blacklisted(literals, globs, source_name, version):
     """Check if a package is blacklisted based on source name and version."""
-    for blacklist in blacklisted_packages:
-        bl_pkg, bl_ver = (blacklist.split("=", 1) + [None])[:2]
-        if fnmatch.fnmatch(source_name, bl_pkg) and (
-            bl_ver is None or bl_ver == version
-        ):
+    # Matched entries are kept: several updates can share a real source name
+    # (e.g. the kernel packages), so a literal can match more than once
+    if source_name in literals:
+        versions = literals[source_name]
+        if versions is None or version in versions:
+            logging.info(f"Package {source_name} version {version} is blacklisted.")
+            return True
+    for pattern, bl_ver in globs:
+        if pattern.match(source_name) and (bl_ver is None or bl_ver == version):
             logging.info(f"Package {source_name} version {version} is blacklisted.")
             return True
     return False
@@ -32,42 +55,74 @@ def is_blacklisted(blacklisted_packages, source_name, version):
 def refresh_cache():
     """Refresh the APT cache."""
     try:
-        subprocess.run(["sudo", "/usr/bin/mint-refresh-cache"], check=True)
+        subprocess.check_call(["sudo", "/usr/bin/mint-refresh-cache"])
         logging.info("APT cache refreshed successfully.")
     except subprocess.CalledProcessError as e:
         logging.error(f"Failed to refresh APT cache: {e}")
         sys.exit(1)
 
 
-def load_blacklist(ignore_list):
-    """Load the blacklist from file and combine with ignore list."""
-    blacklisted = set()
-    if os.path.exists("/etc/mintupdate.blacklist"):
-        with open("/etc/mintupdate.blacklist") as blacklist_file:
-            blacklisted = {
+def read_blacklist_file():
+    """Return the entries of the blacklist file, parsed again only if it changed."""
+    try:
+        mtime = os.stat(BLACKLIST_FILE).st_mtime_ns
+    except FileNotFoundError:
+        return frozenset()
+    if mtime != _blacklist_cache["mtime"]:
+        with open(BLACKLIST_FILE) as blacklist_file:
+            entries = frozenset(
                 line.strip()
                 for line in blacklist_file
                 if line.strip() and not line.strip().startswith("#")
-            }
+            )
+        _blacklist_cache["mtime"] = mtime
+        _blacklist_cache["entries"] = entries
+    return _blacklist_cache["entries"]
+
+
+def load_blacklist(ignore_list):
+    """Load the blacklist from file and combine with ignore list.
+
+    Returns a (literals, globs) tuple for is_blacklisted().
+    """
+    blacklisted = set(read_blacklist_file())
     if ignore_list:
         blacklisted.update(ignore_list.split(","))
-    return blacklisted
+
+    # Literal names map to their blacklisted versions (None for any version),
+    # glob patterns are compiled once along with their version
+    literals = {}
+    globs = []
+    for blacklist in blacklisted:
+        bl_pkg, bl_ver = (blacklist.split("=", 1) + [None])[:2]
+        if any(char in bl_pkg for char in GLOB_CHARS):
+            globs.append((compile_glob(bl_pkg), bl_ver))
+        elif bl_ver is None:
+            literals[bl_pkg] = None
+        else:
+            versions = literals.setdefault(bl_pkg, set())
+            if versions is not None:
+                versions.add(bl_ver)
+    return literals, globs
 
 
 def filter_updates(check, blacklisted, args):
     """Filter updates based on user options and blacklist."""
+    literals, globs = blacklisted
     updates = []
-    for source_name in sorted(check.updates.keys()):
-        update = check.updates[source_name]
-        if (
-            source_name in PRIORITY_UPDATES
-            or (args.only_kernel and update.type == "kernel")
-            or (args.only_security and update.type == "security")
-            or not is_blacklisted(
-                blacklisted, update.real_source_name, update.new_version
-            )
-        ):
+    for source_name, update in sorted(check.updates.items()):
+        # Priority updates are always included, the cheap type filters
+        # run before the blacklist
+        if source_name in PRIORITY_SOURCE_NAMES:
             updates.append(update)
+            continue
+        if args.only_kernel and update.type != "kernel":
+            continue
+        if args.only_security and update.type != "security":
+            continue
+        if is_blacklisted(literals, globs, update.real_source_name, update.new_version):
+            continue
+        updates.append(update)
     return updates
 
 
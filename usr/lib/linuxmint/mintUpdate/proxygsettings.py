@@ -1,12 +1,20 @@
-import subprocess
 from urllib.parse import quote
 
-# GSettings command to fetch proxy configurations
-GSETTINGS_CMDLINE = "gsettings list-recursively org.gnome.system.proxy"
-CANNOT_PARSE_WARNING = "Cannot parse gsettings value: %r"
+import gi
+gi.require_version("Gio", "2.0")
+from gi.repository import Gio
+
+# GSettings schema of the proxy configuration
+PROXY_SCHEMA = "org.gnome.system.proxy"
+MISSING_SCHEMA_WARNING = "Missing gsettings schema: %r"
 MISSING_KEY_WARNING = "Missing expected gsettings key: %r"
 UNSUPPORTED_MODE_WARNING = "Unsupported proxy mode: %r"
 
+# Gio.Settings of the proxy schema and its children, by key prefix
+_proxy_gsettings = {}
+# Result of get_proxy_settings(), reset when a proxy setting changes
+_cached = {"settings": None}
+
 
 def parse_proxy_hostspec(hostspec):
     """
@@ -16,13 +24,12 @@ def parse_proxy_hostspec(hostspec):
     protocol, username, password, hostname = None, None, None, hostspec
 
     if "://" in hostname:
-        protocol, hostname = hostname.split("://", 1)
+        protocol, _, hostname = hostname.partition("://")
     if "@" in hostname:
-        user_info, hostname = hostname.rsplit("@", 1)
-        if ":" in user_info:
-            username, password = user_info.split(":", 1)
-        else:
-            username = user_info
+        user_info, _, hostname = hostname.rpartition("@")
+        username, separator, password = user_info.partition(":")
+        if not separator:
+            password = None
 
     return protocol, hostname, username, password
 
@@ -71,66 +78,93 @@ def proxy_url_from_settings(scheme, gsettings):
     return proxy_url
 
 
-def get_proxy_settings():
+def read_proxy_gsettings():
     """
-    Parse Gnome's proxy settings and return a dictionary containing proxy URLs
-    for supported schemes (http, https). Includes handling for manual, auto, and direct modes.
+    Read the proxy schema and its children (http, https...) into a flat dictionary
+    of typed values keyed relative to the schema (e.g. 'mode', 'http.host').
+    Returns None if the schema isn't installed.
     """
-    try:
-        output = subprocess.check_output(GSETTINGS_CMDLINE.split()).decode("utf-8")
-    except subprocess.CalledProcessError as e:
-        print(f"Error executing gsettings command: {e}")
-        return {}
+    if not _proxy_gsettings:
+        source = Gio.SettingsSchemaSource.get_default()
+        if source is None or source.lookup(PROXY_SCHEMA, True) is None:
+            print(MISSING_SCHEMA_WARNING % PROXY_SCHEMA)
+            return None
+
+        root = Gio.Settings.new(PROXY_SCHEMA)
+        _proxy_gsettings[""] = root
+        for child_name in root.props.settings_schema.list_children():
+            _proxy_gsettings[f"{child_name}."] = root.get_child(child_name)
+        for settings in _proxy_gsettings.values():
+            settings.connect("changed", _on_proxy_gsettings_changed)
 
     gsettings = {}
-    base_len = len("org.gnome.system.proxy.")
-
-    for line in output.split("\n"):
-        line = line.strip()
-        if not line:
-            continue
-        try:
-            path, key, value = line.split(" ", 2)
-        except ValueError:
-            print(CANNOT_PARSE_WARNING % line)
-            continue
-
-        # Parse the value based on its type
-        if value.startswith("'"):
-            parsed_value = value[1:-1]
-        elif value.startswith(("[", "@")):
-            parsed_value = value
-        elif value in ("true", "false"):
-            parsed_value = value == "true"
-        elif value.isdigit():
-            parsed_value = int(value)
-        else:
-            print(CANNOT_PARSE_WARNING % value)
-            parsed_value = value
+    for prefix, settings in _proxy_gsettings.items():
+        for key in settings.props.settings_schema.list_keys():
+            gsettings[prefix + key] = settings.get_value(key).unpack()
 
-        relative_key = (path + "." + key)[base_len:]
-        gsettings[relative_key] = parsed_value
+    return gsettings
 
-    mode = gsettings.get("mode", "none").lower()
+
+def _on_proxy_gsettings_changed(settings, key):
+    """Drop the cached proxy settings when any proxy key changes."""
+    _cached["settings"] = None
+
+
+def manual_proxy_settings(gsettings):
+    """Return the proxy URLs of the supported schemes."""
     settings = {}
+    for scheme in ["http", "https"]:
+        scheme_settings = proxy_url_from_settings(scheme, gsettings)
+        if scheme_settings:
+            settings[scheme] = scheme_settings
+    return settings
 
-    if mode == "manual":
-        for scheme in ["http", "https"]:
-            scheme_settings = proxy_url_from_settings(scheme, gsettings)
-            if scheme_settings:
-                settings[scheme] = scheme_settings
-    elif mode == "auto":
-        pac_url = gsettings.get("autoconfig-url")
-        if pac_url:
-            settings["pac"] = pac_url
-        else:
-            print(MISSING_KEY_WARNING % "autoconfig-url")
-    elif mode == "none" or mode == "direct":
-        settings["direct"] = True
+
+def auto_proxy_settings(gsettings):
+    """Return the URL of the proxy autoconfiguration (PAC) file."""
+    pac_url = gsettings.get("autoconfig-url")
+    if not pac_url:
+        print(MISSING_KEY_WARNING % "autoconfig-url")
+        return {}
+    return {"pac": pac_url}
+
+
+def direct_proxy_settings(gsettings):
+    """Return the settings of a direct connection."""
+    return {"direct": True}
+
+
+# Settings builders by proxy mode
+PROXY_MODE_HANDLERS = {
+    "manual": manual_proxy_settings,
+    "auto": auto_proxy_settings,
+    "none": direct_proxy_settings,
+    "direct": direct_proxy_settings,
+}
+
+
+def get_proxy_settings():
+    """
+    Parse Gnome's proxy settings and return a dictionary containing proxy URLs
+    for supported schemes (http, https). Includes handling for manual, auto, and direct modes.
+    """
+    if _cached["settings"] is not None:
+        return dict(_cached["settings"])
+
+    gsettings = read_proxy_gsettings()
+    if gsettings is None:
+        return {}
+
+    mode = gsettings.get("mode", "none").lower()
+    handler = PROXY_MODE_HANDLERS.get(mode)
+    if handler is not None:
+        settings = handler(gsettings)
     else:
         print(UNSUPPORTED_MODE_WARNING % mode)
+        settings = {}
 
-    return settings
+    _cached["settings"] = settings
+    return dict(settings)
 
 
 def validate_proxy_settings(settings):
@@ -3,27 +3,43 @@
 import configparser
 import gettext
 import os
+import re
 import tempfile
 from subprocess import PIPE, Popen
 import sys
 import time
-import threading
 import shutil
-import signal
 
 import gi
 gi.require_version('Gtk', '3.0')
-from gi.repository import Gtk
+from gi.repository import Gio, GLib, Gtk
 
 import apt
 
 gettext.install("mintupdate", "/usr/share/locale")
 
+# Exit status of the upgrade when it was canceled (see rel_upgrade_root.py)
+UPGRADE_CANCELED_STATUS = 2
+
+
+def read_mint_info(path="/etc/linuxmint/info"):
+    """
+    Returns the KEY=value pairs of the Linux Mint info file, keeping only the
+    first word of each value (e.g. "Cinnamon" for EDITION="Cinnamon 64-bit").
+    """
+    with open(path, "r") as info:
+        return dict(re.findall(r'^\s*(\w+)="?([^"\s]+)', info.read(), re.MULTILINE))
+
 
 class Assistant:
 
     def __init__(self):
 
+        # Opened on first use, see check_meta()
+        self.apt_cache = None
+        # Popen of the running release upgrade
+        self.upgrade_proc = None
+
         self.assistant = Gtk.Assistant()
         self.assistant.set_position(Gtk.WindowPosition.CENTER)
         self.assistant.set_title(_("System Upgrade"))
@@ -44,15 +60,9 @@ class Assistant:
         if not os.path.exists("/etc/linuxmint/info"):
             self.show_message('/usr/lib/linuxmint/mintUpdate/rel_upgrades/failure.png', _("Your system is missing critical components. A package corresponding to your edition of Linux Mint should provide the virtual package 'mint-info' and the file /etc/linuxmint/info."))
         else:
-            self.current_codename = 'unknown'
-            self.current_edition = 'unknown'
-            with open("/etc/linuxmint/info", "r") as info:
-                for line in info:
-                    line = line.strip()
-                    if "EDITION=" in line:
-                        self.current_edition = line.split('=')[1].replace('"', '').split()[0]
-                    if "CODENAME=" in line:
-                        self.current_codename = line.split('=')[1].replace('"', '').split()[0]
+            info = read_mint_info()
+            self.current_codename = info.get("CODENAME", "unknown")
+            self.current_edition = info.get("EDITION", "unknown")
             rel_path = "/usr/share/mint-upgrade-info/%s" % self.current_codename
             if not os.path.exists(rel_path):
                 self.show_message('/usr/lib/linuxmint/mintUpdate/rel_upgrades/info.png', _("No upgrades were found."))
@@ -208,22 +218,23 @@ class Assistant:
         if os.environ.get("XDG_SESSION_TYPE", "x11") == "x11":
             cmd += ["--parent-window-id", "%s" % self.assistant.get_window().get_xid()]
 
-        f = tempfile.NamedTemporaryFile()
-        for pkg in packages:
-            pkg_line = "%s\tinstall\n" % pkg
-            f.write(pkg_line.encode("utf-8"))
+        # Written and closed before synaptic reads it
+        with tempfile.NamedTemporaryFile("w", suffix=".sel", delete=False) as f:
+            f.write("".join("%s\tinstall\n" % pkg for pkg in packages))
         cmd.append("--set-selections-file")
         cmd.append("%s" % f.name)
-        f.flush()
         try:
-            comnd = Popen(' '.join(cmd), shell=True)
+            comnd = Popen(cmd)
             returnCode = comnd.wait()
         except Exception as e:
             print(f"Error running synaptic: {e}")
             self.show_message('/usr/lib/linuxmint/mintUpdate/rel_upgrades/failure.png', _("An error occurred while installing the missing package. Please try again later."))
             return
         finally:
-            f.close()
+            os.unlink(f.name)
+        # Synaptic changed the installed packages
+        if self.apt_cache is not None:
+            self.apt_cache.open()
         self.check_reqs()
 
     def check_meta(self):
@@ -231,7 +242,9 @@ class Assistant:
         Checks if the `mint-meta-edition` package is installed.
         """
         meta = "mint-meta-%s" % self.current_edition.lower()
-        cache = apt.Cache()
+        if self.apt_cache is None:
+            self.apt_cache = apt.Cache()
+        cache = self.apt_cache
         if meta in cache:
             if cache[meta].is_installed:
                 return True
@@ -256,8 +269,11 @@ class Assistant:
 
     def show_message(self, icon, msg):
         """
-        Displays a message box with an icon and a message.
+        Displays a message box with an icon and a message, from the main loop.
         """
+        GLib.idle_add(self.run_message_dialog, icon, msg)
+
+    def run_message_dialog(self, icon, msg):
         dialog = Gtk.MessageDialog(
             parent=self.assistant.get_window(),
             flags=0,
@@ -268,6 +284,7 @@ class Assistant:
         dialog.set_icon_from_file(icon)
         dialog.run()
         dialog.destroy()
+        return False
 
     def cancel_button_pressed(self, assistant):
         """
@@ -287,27 +304,29 @@ class Assistant:
         """
 
         # Turn off the screensaver during the upgrade
-        screensaver_setting = None
-        screensaver_enabled = "true"
+        # (kept on self, so upgrade_process can restore it)
+        self.screensaver_settings = None
+        self.screensaver_enabled = True
+        screensaver_schema = None
         if self.current_edition.lower() == "cinnamon":
-            screensaver_setting = "org.cinnamon.desktop.screensaver lock-enabled"
+            screensaver_schema = "org.cinnamon.desktop.screensaver"
         elif self.current_edition.lower() == "mate":
-            screensaver_setting = "org.mate.screensaver lock-enabled"
-        if screensaver_setting is not None:
+            screensaver_schema = "org.mate.screensaver"
+        if screensaver_schema is not None:
             try:
-                enabled = os.popen("gsettings get %s" % screensaver_setting).readlines()[0].strip()
-                if enabled == "false":
-                    screensaver_enabled = "false"
-                else:
-                    os.system("gsettings set %s false" % screensaver_setting)
+                source = Gio.SettingsSchemaSource.get_default()
+                if source.lookup(screensaver_schema, True) is not None:
+                    self.screensaver_settings = Gio.Settings.new(screensaver_schema)
+                    self.screensaver_enabled = self.screensaver_settings.get_boolean("lock-enabled")
+                    if self.screensaver_enabled:
+                        self.screensaver_settings.set_boolean("lock-enabled", False)
             except Exception as e:
                 print(f"Error managing screensaver: {e}")
                 self.show_message('/usr/lib/linuxmint/mintUpdate/rel_upgrades/failure.png', _("An error occurred while managing the screensaver. Please try again later."))
                 return
 
-        # Start the upgrade process in a separate thread
-        upgrade_thread = threading.Thread(target=self.upgrade_process)
-        upgrade_thread.start()
+        # Start the upgrade process, upgrade_finished() runs when it exits
+        self.upgrade_process()
 
         # Show the summary page and progress bar
         self.assistant.set_page(self.vbox_summary)
@@ -315,7 +334,7 @@ class Assistant:
 
     def upgrade_process(self):
         """
-        Performs the system upgrade in a separate thread.
+        Starts the system upgrade without blocking the main loop.
         """
         cmd = [
             "pkexec", "/usr/bin/mint-release-upgrade-root",
@@ -325,81 +344,124 @@ class Assistant:
         if os.environ.get("XDG_SESSION_TYPE", "x11") == "x11":
             cmd += ["%s" % self.assistant.get_window().get_xid()]
 
+        self.upgrade_canceled = False
         try:
-            # Start the upgrade process
-            comnd = Popen(' '.join(cmd), shell=True)
-            returnCode = comnd.wait()
-
-            # Update the progress bar and status label
-            self.update_progress_bar(100)
-            self.update_status_label(_("Upgrade complete. Please reboot."))
-
-            # Reset the screensaver the way it was before the upgrade
-            if screensaver_setting is not None:
-                try:
-                    os.system("gsettings set %s %s" % (screensaver_setting, screensaver_enabled))
-                except Exception as e:
-                    print(f"Error restoring screensaver: {e}")
-                    self.show_message('/usr/lib/linuxmint/mintUpdate/rel_upgrades/failure.png', _("An error occurred while restoring the screensaver. Please try again later."))
-                    return
-
-            # Check the upgrade status
-            new_codename = 'unknown'
-            if os.path.exists("/etc/linuxmint/info"):
-                try:
-                    with open("/etc/linuxmint/info", "r") as info:
-                        for line in info:
-                            line = line.strip()
-                            if "CODENAME=" in line:
-                                new_codename = line.split('=')[1].replace('"', '').split()[0]
-                                break
-                except Exception as e:
-                    print(f"Error reading info file: {e}")
-                    self.show_message('/usr/lib/linuxmint/mintUpdate/rel_upgrades/failure.png', _("An error occurred while reading the system information. Please try again later."))
-                    return
-
-            if new_codename == self.rel_target_codename:
-                image_result = "success"
-                message_text = _("Your operating system was successfully upgraded. Please reboot your computer for all changes to take effect.")
-            else:
-                image_result = "failure"
-                message_text = _("The upgrade did not succeed. Make sure you are connected to the Internet and try to upgrade again.")
-
-                # Display the failure message
-                self.update_progress_bar(0)
-                self.update_status_label(message_text)
-                self.show_message('/usr/lib/linuxmint/mintUpdate/rel_upgrades/%s.png' % image_result, message_text)
-
+            self.upgrade_proc = Popen(cmd)
         except Exception as e:
             print(f"Error during upgrade process: {e}")
+            self.upgrade_proc = None
+            self.cancel_button.set_sensitive(False)
             self.update_progress_bar(0)
             self.update_status_label(_("An error occurred during the upgrade process. Please try again later."))
-            self.show_message('/usr/lib/linuxmint/mintUpdate/rel_upgrades/failure.png', _("An error occurred during the upgrade process. Please try again later."), Gtk.MessageType.ERROR)
+            self.show_message('/usr/lib/linuxmint/mintUpdate/rel_upgrades/failure.png', _("An error occurred during the upgrade process. Please try again later."))
             return
+        self.cancel_button.set_sensitive(True)
+        GLib.child_watch_add(GLib.PRIORITY_DEFAULT, self.upgrade_proc.pid, self.upgrade_finished)
+
+    def upgrade_finished(self, pid, status):
+        """
+        Handles the end of the upgrade process.
+        """
+        self.upgrade_proc = None
+        self.cancel_button.set_sensitive(False)
+
+        # Reset the screensaver the way it was before the upgrade
+        if self.screensaver_settings is not None:
+            try:
+                self.screensaver_settings.set_boolean("lock-enabled", self.screensaver_enabled)
+            except Exception as e:
+                print(f"Error restoring screensaver: {e}")
+                self.show_message('/usr/lib/linuxmint/mintUpdate/rel_upgrades/failure.png', _("An error occurred while restoring the screensaver. Please try again later."))
+                return
+
+        # A canceled upgrade stops between two steps, if it already finished
+        # its last one the result is shown as usual
+        if os.waitstatus_to_exitcode(status) == UPGRADE_CANCELED_STATUS:
+            self.update_progress_bar(0)
+            self.update_status_label(_("Upgrade canceled."))
+            self.show_message('/usr/lib/linuxmint/mintUpdate/rel_upgrades/cancel.png', _("Upgrade canceled."))
+            return
+
+        # Update the progress bar and status label
+        self.update_progress_bar(100)
+        self.update_status_label(_("Upgrade complete. Please reboot."))
+
+        # Check the upgrade status
+        new_codename = 'unknown'
+        if os.path.exists("/etc/linuxmint/info"):
+            try:
+                new_codename = read_mint_info().get("CODENAME", "unknown")
+            except Exception as e:
+                print(f"Error reading info file: {e}")
+                self.show_message('/usr/lib/linuxmint/mintUpdate/rel_upgrades/failure.png', _("An error occurred while reading the system information. Please try again later."))
+                return
+
+        if new_codename != self.rel_target_codename:
+            message_text = _("The upgrade did not succeed. Make sure you are connected to the Internet and try to upgrade again.")
+
+            # Display the failure message
+            self.update_progress_bar(0)
+            self.update_status_label(message_text)
+            self.show_message('/usr/lib/linuxmint/mintUpdate/rel_upgrades/failure.png', message_text)
 
     def update_progress_bar(self, percentage):
         """
-        Updates the progress bar with the given percentage.
+        Updates the progress bar with the given percentage, from the main loop.
         """
+        GLib.idle_add(self.set_progress_bar, percentage)
+
+    def set_progress_bar(self, percentage):
         fraction = percentage / 100.0
         self.progress_bar.set_fraction(fraction)
         self.progress_bar.set_text("%s%%" % percentage)
+        return False
 
     def update_status_label(self, text):
         """
-        Updates the status label with the given text.
+        Updates the status label with the given text, from the main loop.
         """
+        GLib.idle_add(self.set_status_label, text)
+
+    def set_status_label(self, text):
         self.status_label.set_markup(text)
+        return False
 
     def cancel_upgrade(self, widget):
         """
         Cancels the upgrade process.
         """
-        # Send a signal to the upgrade thread to stop
-        os.kill(os.getpid(), signal.SIGINT)
-        self.update_progress_bar(0)
-        self.update_status_label(_("Upgrade canceled."))
-        self.show_message('/usr/lib/linuxmint/mintUpdate/rel_upgrades/cancel.png', _("Upgrade canceled."), Gtk.MessageType.INFO)
+        if self.upgrade_proc is None or self.upgrade_canceled:
+            return
+        # The upgrade runs as root, so it is stopped through pkexec as well
+        cmd = [
+            "pkexec", "/usr/bin/mint-release-upgrade-root",
+            "--cancel", "%s" % self.upgrade_proc.pid
+        ]
+        try:
+            cancel_proc = Popen(cmd)
+        except Exception as e:
+            print(f"Error canceling the upgrade: {e}")
+            self.show_message('/usr/lib/linuxmint/mintUpdate/rel_upgrades/failure.png', _("The upgrade could not be canceled."))
+            return
+        self.upgrade_canceled = True
+        self.cancel_button.set_sensitive(False)
+        GLib.child_watch_add(GLib.PRIORITY_DEFAULT, cancel_proc.pid, self.cancel_finished)
+
+    def cancel_finished(self, pid, status):
+        """
+        Handles the end of the cancel request.
+        """
+        if os.waitstatus_to_exitcode(status) == 0:
+            # upgrade_finished() reports the cancellation once it stopped
+            if self.upgrade_proc is not None:
+                self.update_status_label(_("Canceling the upgrade after the current step..."))
+            return
+
+        print("Error canceling the upgrade")
+        self.upgrade_canceled = False
+        self.show_message('/usr/lib/linuxmint/mintUpdate/rel_upgrades/failure.png', _("The upgrade could not be canceled."))
+        if self.upgrade_proc is not None:
+            self.cancel_button.set_sensitive(True)
 
 
 Assistant()
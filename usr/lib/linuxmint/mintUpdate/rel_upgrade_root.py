@@ -1,20 +1,44 @@
 #!/usr/bin/python3
 
+import filecmp
 import os
 import sys
+import time
 import apt
 import gettext
 import tempfile
 import subprocess
 import shutil
+import signal
 import syslog
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import contextmanager
 
 # Localization
 gettext.install("mintupdate", "/usr/share/locale")
 
-# Global cache for disk space
+APT_LISTS_DIR = "/var/lib/apt/lists"
+PKGCACHE_FILE = "/var/cache/apt/pkgcache.bin"
+# Age in seconds after which the APT lists are refreshed even if the sources
+# didn't change
+APT_LISTS_MAX_AGE = 24 * 3600
+# Packages whose changes require the GRUB configuration to be regenerated
+BOOT_PACKAGE_PREFIXES = ("linux-image-", "grub-", "grub2-", "shim-")
+
+# Exit status when the upgrade was canceled (see rel_upgrade.py)
+CANCELED_EXIT_STATUS = 2
+
+# Seconds for which the available disk space is reused
+DISK_SPACE_CACHE_TTL = 2.0
+
+# Global cache for disk space, as (timestamp, available bytes)
 _disk_space_cache = None
+# Global APT cache, opened once (see get_apt_cache)
+_apt_cache = None
+# Modification time of the binary package cache when it was opened
+_apt_cache_mtime = None
+# Set by SIGTERM, the upgrade then stops before its next step
+_cancel_requested = False
 
 
 def print_error_and_exit(message):
@@ -29,6 +53,19 @@ def print_info(message):
     print(f"INFO: {message}")
 
 
+def request_cancel(signum, frame):
+    """Handles SIGTERM, interrupting a step could leave dpkg half done."""
+    global _cancel_requested
+    _cancel_requested = True
+
+
+def exit_if_canceled():
+    """Exits between two steps of the upgrade if it was canceled."""
+    if _cancel_requested:
+        print_info("Upgrade canceled")
+        sys.exit(CANCELED_EXIT_STATUS)
+
+
 def report_status(step):
     """Reports the status of a given step."""
     print(f"Starting: {step}")
@@ -37,18 +74,47 @@ def report_status(step):
 def check_dependencies():
     """Checks if required dependencies are installed."""
     dependencies = ["synaptic", "update-grub", "apt-get"]
-    for dep in dependencies:
-        if shutil.which(dep) is None:
-            print_error_and_exit(f"Required dependency {dep} is not installed.")
+    # Look for all of them in a single walk of PATH
+    missing = set(dependencies)
+    for directory in os.environ.get("PATH", os.defpath).split(os.pathsep):
+        try:
+            with os.scandir(directory or os.curdir) as entries:
+                for entry in entries:
+                    if (
+                        entry.name in missing
+                        and not entry.is_dir()
+                        and os.access(entry.path, os.X_OK)
+                    ):
+                        missing.discard(entry.name)
+        except OSError:
+            continue
+        if not missing:
+            return
+    print_error_and_exit(
+        f"Required dependencies not installed: {', '.join(sorted(missing))}"
+    )
+
+
+def check_required_files(paths):
+    """Checks if the required files exist, stat'ing them in parallel."""
+    if len(paths) > 1:
+        with ThreadPoolExecutor(max_workers=len(paths)) as executor:
+            found = list(executor.map(os.path.exists, paths))
+    else:
+        found = [os.path.exists(path) for path in paths]
+    for path, exists in zip(paths, found):
+        if not exists:
+            print_error_and_exit(f"Required file {path} not found.")
 
 
 def get_disk_space():
     """Returns the available disk space in gigabytes."""
     global _disk_space_cache
-    if _disk_space_cache is None:
+    now = time.monotonic()
+    if _disk_space_cache is None or now - _disk_space_cache[0] >= DISK_SPACE_CACHE_TTL:
         statvfs = os.statvfs("/")
-        _disk_space_cache = (statvfs.f_frsize * statvfs.f_bavail) / 1024**3
-    return _disk_space_cache
+        _disk_space_cache = (now, statvfs.f_frsize * statvfs.f_bavail)
+    return _disk_space_cache[1] / 1024**3
 
 
 def check_disk_space(required_space_gb):
@@ -62,36 +128,43 @@ def check_disk_space(required_space_gb):
 
 @contextmanager
 def temporary_file():
-    """Context manager for creating and cleaning up a temporary file."""
-    f = tempfile.NamedTemporaryFile(delete=False)
+    """Context manager for creating and cleaning up a temporary file.
+
+    Yields the raw file descriptor and the path of the file.
+    """
+    fd, path = tempfile.mkstemp(prefix="mintupdate-")
     try:
-        yield f
+        yield fd, path
     finally:
-        f.close()
-        os.remove(f.name)
+        try:
+            os.close(fd)
+        except OSError:
+            pass
+        os.unlink(path)
 
 
 def run_command(command, error_message):
     """Runs a command and handles errors."""
+    # The output goes straight to our stdout/stderr instead of being
+    # buffered until the command exits
+    sys.stdout.flush()
     try:
-        result = subprocess.run(
-            command,
-            check=True,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            text=True,
-        )
-        print_info(result.stdout)
+        subprocess.run(command, check=True)
     except subprocess.CalledProcessError as e:
         print_error_and_exit(
-            f"{error_message} (Command: {' '.join(command)}): {e.stderr}"
+            f"{error_message} (Command: {' '.join(command)}): exit status {e.returncode}"
         )
 
 
-def manage_packages(packages, action, window_id):
-    """Manages packages using Synaptic."""
-    valid_packages = [pkg for pkg in packages if check_package_exists(pkg)]
-    if valid_packages:
+def manage_packages(selections, window_id):
+    """Manages packages using Synaptic, selections are (package, action) pairs."""
+    # Filter the whole list against the one cache
+    try:
+        cache = get_apt_cache()
+    except Exception as e:
+        print_error_and_exit(f"Failed to open the APT cache: {e}")
+    valid_selections = [(pkg, action) for pkg, action in selections if pkg in cache]
+    if valid_selections:
         cmd = [
             "sudo",
             "/usr/sbin/synaptic",
@@ -103,39 +176,53 @@ def manage_packages(packages, action, window_id):
             "Synaptic::closeZvt=true",
             "--set-selections-file",
         ]
-        with temporary_file() as f:
-            for package in valid_packages:
-                f.write(f"{package}\t{action}\n".encode("utf-8"))
-            cmd.append(f.name)
-        run_command(cmd, "Failed to manage packages")
-
-
-def check_package_exists(package_name):
-    """Checks if a package exists in the APT cache."""
+        payload = "".join(
+            f"{package}\t{action}\n" for package, action in valid_selections
+        ).encode("utf-8")
+        with temporary_file() as (fd, path):
+            os.write(fd, payload)
+            cmd.append(path)
+            # The file is removed when leaving the block
+            run_command(cmd, "Failed to manage packages")
+
+
+def get_apt_cache():
+    """Returns the APT cache, opening it on first use."""
+    global _apt_cache, _apt_cache_mtime
+    if _apt_cache is None:
+        _apt_cache = apt.Cache()
+        _apt_cache_mtime = get_pkgcache_mtime()
+    return _apt_cache
+
+
+def get_pkgcache_mtime():
+    """Returns the modification time of the binary package cache."""
     try:
-        cache = apt.Cache()
-        return package_name in cache
-    except Exception as e:
-        print_error_and_exit(f"Failed to check package {package_name}: {e}")
+        return os.path.getmtime(PKGCACHE_FILE)
+    except OSError:
+        return None
 
 
 def file_to_list(filename):
     """Reads a file and returns a list of non-comment, non-empty lines."""
-    if os.path.exists(filename):
-        with open(filename, "r") as file_handle:
-            return [
-                line.strip()
-                for line in file_handle
-                if line.strip() and not line.startswith("#")
-            ]
-    return []
-
-
-def backup_file(filepath):
-    """Creates a backup of the specified file."""
+    try:
+        with open(filename, "r", encoding="utf-8", errors="replace") as file_handle:
+            data = file_handle.read()
+    except FileNotFoundError:
+        return []
+    lines = (line.strip() for line in data.splitlines())
+    return [line for line in lines if line and not line.startswith("#")]
+
+
+def backup_file(filepath, move=False):
+    """Creates a backup of the specified file, or moves it to its backup."""
     backup_path = f"{filepath}.bak"
     try:
-        shutil.copy(filepath, backup_path)
+        if move:
+            # Same directory, so a rename without copying any data
+            os.replace(filepath, backup_path)
+        else:
+            shutil.copy(filepath, backup_path)
         print_info(f"Backup created for {filepath}")
     except IOError as e:
         print_error_and_exit(f"Failed to create backup for {filepath}: {e}")
@@ -153,23 +240,41 @@ def restore_backup(backup_path):
 
 
 def update_apt_sources(sources_list):
-    """Updates the APT sources list."""
+    """Updates the APT sources list, returns False if it was already up to date."""
     report_status("Updating APT sources")
     target_path = "/etc/apt/sources.list.d/official-package-repositories.list"
-    backup_file(target_path)
+    if os.path.exists(target_path) and filecmp.cmp(sources_list, target_path, shallow=False):
+        print_info(f"{target_path} is already up to date")
+        return False
     if os.path.exists(target_path):
-        os.remove(target_path)
+        # The old list is replaced anyway, move it to the backup
+        backup_file(target_path, move=True)
     shutil.copy(sources_list, target_path)
+    return True
+
+
+def apt_lists_are_fresh():
+    """Checks if the APT lists were refreshed recently."""
+    try:
+        return time.time() - os.path.getmtime(APT_LISTS_DIR) < APT_LISTS_MAX_AGE
+    except OSError:
+        return False
 
 
 def upgrade_system(cache):
-    """Upgrades the system using APT."""
+    """Upgrades the system using APT, returns True if boot packages changed."""
     report_status("Upgrading system")
     try:
-        cache.update()
-        cache.open(None)
+        # The lists were refreshed by Synaptic (or were recent enough),
+        # only reopen the cache if it was rebuilt since it was opened
+        if cache is not _apt_cache or get_pkgcache_mtime() != _apt_cache_mtime:
+            cache.open(None)
         cache.upgrade(True)
+        boot_changed = any(
+            pkg.name.startswith(BOOT_PACKAGE_PREFIXES) for pkg in cache.get_changes()
+        )
         cache.commit()
+        return boot_changed
     except apt.cache.FetchFailedException as e:
         print_error_and_exit(f"APT update failed: {e}")
     except apt.cache.LockFailedException as e:
@@ -178,10 +283,15 @@ def upgrade_system(cache):
         print_error_and_exit(f"Failed to perform system upgrade: {e}")
 
 
-def update_grub():
-    """Updates GRUB and adjusts the title."""
+def update_grub(boot_changed=True):
+    """Updates GRUB if boot packages changed and adjusts the title."""
     report_status("Updating GRUB")
-    run_command(["sudo", "update-grub"], "Couldn't update GRUB")
+    # Only regenerate the GRUB menu if a kernel or boot loader changed
+    if boot_changed:
+        run_command(["sudo", "update-grub"], "Couldn't update GRUB")
+    else:
+        print_info("No kernel or boot loader changes, skipping update-grub")
+    # The release name changed, so the title is always adjusted
     adjust_grub_script = (
         "/usr/share/ubuntu-system-adjustments/systemd/adjust-grub-title"
     )
@@ -192,10 +302,11 @@ def update_grub():
 def clean_system():
     """Cleans up unnecessary packages and APT cache."""
     report_status("Cleaning system")
+    # Both steps in a single sudo call
     run_command(
-        ["sudo", "apt-get", "autoremove", "-y"], "Failed to autoremove packages"
+        ["sudo", "sh", "-c", "apt-get autoremove -y && apt-get clean"],
+        "Failed to clean system",
     )
-    run_command(["sudo", "apt-get", "clean"], "Failed to clean APT cache")
 
 
 if __name__ == "__main__":
@@ -223,37 +334,48 @@ if __name__ == "__main__":
         additions_filename,
         removals_filename,
     ]
-    for file in required_files:
-        if not os.path.exists(file):
-            print_error_and_exit(f"Required file {file} not found.")
+    check_required_files(required_files)
+
+    signal.signal(signal.SIGTERM, request_cancel)
 
     try:
-        update_apt_sources(sources_list)
-        run_command(
-            [
-                "sudo",
-                "/usr/sbin/synaptic",
-                "--hide-main-window",
-                "--update-at-startup",
-                "--non-interactive",
-                "--parent-window-id",
-                str(window_id),
-            ],
-            "Failed to update APT cache",
+        exit_if_canceled()
+        sources_changed = update_apt_sources(sources_list)
+        if sources_changed or not apt_lists_are_fresh():
+            run_command(
+                [
+                    "sudo",
+                    "/usr/sbin/synaptic",
+                    "--hide-main-window",
+                    "--update-at-startup",
+                    "--non-interactive",
+                    "--parent-window-id",
+                    str(window_id),
+                ],
+                "Failed to update APT cache",
+            )
+        else:
+            print_info("APT lists are up to date, skipping the update")
+
+        exit_if_canceled()
+        # Opened after the lists update, shared with the package checks since
+        # committing the upgrade doesn't change the known package names
+        cache = get_apt_cache()
+        boot_changed = upgrade_system(cache)
+        exit_if_canceled()
+
+        # Additions and removals are applied in a single Synaptic run
+        selections = [(pkg, "install") for pkg in file_to_list(additions_filename)]
+        selections += [(pkg, "deinstall") for pkg in file_to_list(removals_filename)]
+        if selections:
+            manage_packages(selections, window_id)
+            exit_if_canceled()
+
+        boot_changed = boot_changed or any(
+            pkg.startswith(BOOT_PACKAGE_PREFIXES) for pkg, action in selections
         )
-
-        cache = apt.Cache()
-        upgrade_system(cache)
-
-        additions = file_to_list(additions_filename)
-        if additions:
-            manage_packages(additions, "install", window_id)
-
-        removals = file_to_list(removals_filename)
-        if removals:
-            manage_packages(removals, "deinstall", window_id)
-
-        update_grub()
+        update_grub(boot_changed)
+        exit_if_canceled()
         clean_system()
 
     except Exception as e:
@@ -1,27 +1,38 @@
 #!/usr/bin/python3
 
+import atexit
+import errno
 import os
 import sys
 import shutil
 import logging
+from logging.handlers import MemoryHandler
 
-# Configure logging
-logging.basicConfig(
-    filename="/var/log/synaptic_config_manager.log",
-    level=logging.INFO,
-    format="%(asctime)s - %(levelname)s - %(message)s",
+# Configure logging, records are buffered and written at exit (errors are
+# written right away)
+_log_file_handler = logging.FileHandler(
+    "/var/log/synaptic_config_manager.log", delay=True
 )
+_log_file_handler.setFormatter(
+    logging.Formatter("%(asctime)s - %(levelname)s - %(message)s")
+)
+_log_handler = MemoryHandler(
+    capacity=1024, flushLevel=logging.ERROR, target=_log_file_handler
+)
+logging.basicConfig(level=logging.INFO, handlers=[_log_handler])
+atexit.register(_log_handler.flush)
 
 # Constants for configuration file paths
 SYNAPTIC_CONF = "/root/.synaptic/synaptic.conf"
 WORKAROUND_CONF = "/root/.synaptic/synaptic-mintupdate-workaround.conf"
 SYNAPTIC_DIR = "/root/.synaptic"
 BACKUP_SUFFIX = ".bak"
+PROG = os.path.basename(sys.argv[0])
 
 
 def usage():
     print(
-        f"Usage: {os.path.basename(sys.argv[0])} [enable|disable] [--test]",
+        f"Usage: {PROG} [enable|disable] [--test]",
         file=sys.stderr,
     )
     print("Note: This script must be run with root privileges.", file=sys.stderr)
@@ -47,7 +58,11 @@ def backup_file(file_path):
     if os.path.isfile(file_path):
         backup_path = f"{file_path}{BACKUP_SUFFIX}"
         try:
-            shutil.copy2(file_path, backup_path)
+            try:
+                # A hard link is enough, the original is only ever renamed
+                os.link(file_path, backup_path)
+            except OSError:
+                shutil.copy2(file_path, backup_path)
             logging.info(f"Backup created: '{backup_path}'")
             return backup_path
         except Exception as e:
@@ -58,7 +73,12 @@ def backup_file(file_path):
 
 def move_file(src, dst):
     try:
-        shutil.move(src, dst)
+        try:
+            os.rename(src, dst)
+        except OSError as e:
+            if e.errno != errno.EXDEV:
+                raise
+            shutil.move(src, dst)
         logging.info(f"Moved '{src}' to '{dst}'")
     except FileNotFoundError:
         logging.error(f"Source file '{src}' does not exist.")
@@ -77,8 +97,7 @@ def prompt_user(message):
 
 
 def rename_conf_files(action, test_mode=False):
-    ensure_directory_exists(SYNAPTIC_DIR)
-
+    # The directory is only ensured once a file is actually going to be moved
     synaptic_exists = os.path.isfile(SYNAPTIC_CONF)
     workaround_exists = os.path.isfile(WORKAROUND_CONF)
 
@@ -90,6 +109,7 @@ def rename_conf_files(action, test_mode=False):
             if not test_mode and prompt_user(
                 f"Are you sure you want to enable and move '{WORKAROUND_CONF}' to '{SYNAPTIC_CONF}'?"
             ):
+                ensure_directory_exists(SYNAPTIC_DIR)
                 move_file(WORKAROUND_CONF, SYNAPTIC_CONF)
                 logging.info(f"Enabled: '{SYNAPTIC_CONF}' has been restored.")
                 return True
@@ -111,6 +131,7 @@ def rename_conf_files(action, test_mode=False):
         if not test_mode and prompt_user(
             f"Are you sure you want to disable and move '{SYNAPTIC_CONF}' to '{WORKAROUND_CONF}'?"
         ):
+            ensure_directory_exists(SYNAPTIC_DIR)
             backup_file(SYNAPTIC_CONF)  # Backup before moving
             move_file(SYNAPTIC_CONF, WORKAROUND_CONF)
             logging.info(f"Disabled: '{WORKAROUND_CONF}' has been created.")